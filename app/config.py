@@ -1,13 +1,25 @@
 import boto3
 import json
+import os
+import tempfile
+import threading
+import time
 from typing import Optional
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from botocore.exceptions import ClientError
 from urllib.parse import quote_plus
 
 
+def available_cpus() -> int:
+    # The cores this process may run on, which is fewer than the host's
+    # when the container is pinned to a CPU set
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 class BaseConfig(BaseSettings):
     # Application settings
     ENV_STATE: str = "dev"
@@ -24,6 +36,8 @@ class GlobalConfig(BaseConfig):
     AWS_REGION: Optional[str] = None
     USE_AWS_SECRETS: bool = True
     AWS_SECRET_NAME: Optional[str] = None
+    # Seconds the database secret is cached before it is fetched again
+    AWS_SECRET_TTL: float = Field(300.0, ge=0)
 
     # Database connection components (for building URL)
     DB_USER: Optional[str] = None
@@ -35,6 +49,90 @@ class GlobalConfig(BaseConfig):
     # Database settings
     DATABASE_URL: Optional[str] = None
     DB_ECHO: bool = False
+    DB_ASYNC: bool = False
+    # Run pending schema migrations at startup; when disabled run
+    # python -m app.schema_migrations before deploying
+    DB_AUTO_MIGRATE: bool = True
+
+    # Connection pool settings
+    DB_POOL_SIZE: int = Field(5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(10, ge=0)
+    DB_POOL_TIMEOUT: float = Field(30.0, gt=0)
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_TIMEOUT: Optional[int] = None  # milliseconds
+    # Connections this service may hold across all server workers; when set
+    # the pool of every worker is shrunk to fit
+    DB_MAX_CONNECTIONS: Optional[int] = Field(None, ge=1)
+
+    # Server settings, used by python -m app.server
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = Field(1, ge=1)
+    SERVER_KEEPALIVE: int = Field(5, ge=1)  # seconds
+    SERVER_GRACEFUL_TIMEOUT: int = Field(30, ge=1)  # seconds
+
+    # Ingestion settings
+    UPLOAD_CHUNK_SIZE: int = Field(1000, ge=1)
+    IMPORT_WORKERS: int = Field(2, ge=1)
+    IMPORT_DIR: str = os.path.join(tempfile.gettempdir(), "data-migration-imports")
+    # Seconds a background import's status is kept once it stops updating,
+    # and between its progress writes
+    IMPORT_JOB_TTL: float = Field(24 * 60 * 60.0, gt=0)
+    IMPORT_PROGRESS_INTERVAL: float = Field(1.0, ge=0)
+    REJECTS_DIR: str = os.path.join(tempfile.gettempdir(), "data-migration-rejects")
+    # Seconds a reject file can be downloaded, they hold the rejected rows
+    REJECTS_TTL: float = Field(24 * 60 * 60.0, gt=0)
+    # Parse processes per server worker, defaults to a share of the cores
+    PARSE_WORKERS: Optional[int] = Field(None, ge=1)
+    PARSE_SHARD_BYTES: int = Field(8 * 1024 * 1024, ge=1024)
+    EXPORT_BATCH_SIZE: int = Field(5000, ge=1)
+    # JSON array batches are parsed whole, NDJSON batches are streamed and
+    # written in sub-batches
+    BATCH_MAX_RECORDS: int = Field(1000, ge=1)
+    NDJSON_SUB_BATCH_SIZE: int = Field(1000, ge=1)
+    # Longer NDJSON lines are rejected without being held in memory
+    NDJSON_MAX_LINE_BYTES: int = Field(64 * 1024, ge=1)
+    # Seconds without a checkpoint before another attempt may take over a
+    # resumable upload
+    UPLOAD_SESSION_LEASE: float = Field(300.0, gt=0)
+
+    # Cache settings
+    REFERENCE_CACHE_TTL: float = Field(60.0, ge=0)
+    RESPONSE_CACHE_SIZE: int = Field(1024, ge=0)
+    RESPONSE_CACHE_TTL: float = Field(30.0, ge=0)
+
+    _secret: Optional[dict] = PrivateAttr(None)
+    _secret_loaded_at: float = PrivateAttr(0.0)
+    _secret_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    # Instrumentation settings
+    METRICS_ENABLED: bool = True
+    # Requests slower than this are logged with their slowest statements,
+    # 0 turns the log off
+    SLOW_REQUEST_SECONDS: float = Field(1.0, ge=0)
+    SLOW_REQUEST_STATEMENTS: int = Field(5, ge=0)
+    # Lets upload requests ask for a cProfile run with ?profile=1 or an
+    # X-Profile header, debug only
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = os.path.join(tempfile.gettempdir(), "data-migration-profiles")
+
+    def get_pool_limits(self) -> tuple[int, int]:
+        # Every worker holds a sync pool, plus an async one when enabled
+        if not self.DB_MAX_CONNECTIONS:
+            return self.DB_POOL_SIZE, self.DB_MAX_OVERFLOW
+
+        pools = self.SERVER_WORKERS * (2 if self.DB_ASYNC else 1)
+        budget = max(self.DB_MAX_CONNECTIONS // pools, 1)
+        pool_size = min(self.DB_POOL_SIZE, budget)
+        return pool_size, min(self.DB_MAX_OVERFLOW, budget - pool_size)
+
+    def get_parse_workers(self) -> int:
+        # Every server worker spawns its own parse pool, split the cores
+        # between them instead of giving each one all of them
+        if self.PARSE_WORKERS:
+            return self.PARSE_WORKERS
+        return max(available_cpus() // self.SERVER_WORKERS, 1)
 
     def get_database_url(self) -> str:
         # Option 1: Complete DATABASE_URL
@@ -51,14 +149,31 @@ class GlobalConfig(BaseConfig):
             )
 
         # Option 3: AWS Secrets Manager
-        if self.USE_AWS_SECRETS and self.AWS_SECRET_NAME:
-            credentials = self._get_secret_from_aws()
-            return self._build_database_url(credentials)
+        if self.uses_aws_secrets():
+            return self._build_database_url(self.get_secret())
 
         raise ValueError(
             "Database configuration not properly set. Provide DATABASE_URL, AWS credentials, or individual DB components."
         )
 
+    def uses_aws_secrets(self) -> bool:
+        return (
+            not self.DATABASE_URL
+            and not (self.DB_USER and self.DB_PASSWORD)
+            and self.USE_AWS_SECRETS
+            and bool(self.AWS_SECRET_NAME)
+        )
+
+    def get_secret(self) -> dict:
+        with self._secret_lock:
+            if (
+                self._secret is None
+                or time.monotonic() - self._secret_loaded_at > self.AWS_SECRET_TTL
+            ):
+                self._secret = self._get_secret_from_aws()
+                self._secret_loaded_at = time.monotonic()
+            return self._secret
+
     def _get_secret_from_aws(self) -> dict:
         # Create a Secrets Manager client
         session = boto3.session.Session()
@@ -98,10 +213,27 @@ class DevConfig(GlobalConfig):
     # Database settings
     DB_ECHO: bool = True
 
+    # Instrumentation settings
+    PROFILING_ENABLED: bool = True
+
     model_config = SettingsConfigDict(env_prefix="DEV_", env_file=".env")
 
 
 class ProdConfig(GlobalConfig):
+    # RDS drops idle connections, so validate and recycle them
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+
+    # Well under the ~400 connections of the default db.t3.medium instance,
+    # leaving room for migrations, the analytics jobs and admin sessions
+    DB_MAX_CONNECTIONS: Optional[int] = Field(100, ge=1)
+
+    # Server settings, one worker per available core by default; keep-alive
+    # outlasts the load balancer's idle timeout so it never reuses a closed
+    # socket
+    SERVER_WORKERS: int = Field(default_factory=available_cpus, ge=1)
+    SERVER_KEEPALIVE: int = Field(65, ge=1)
+
     model_config = SettingsConfigDict(env_prefix="PROD_", env_file=".env")
 
 
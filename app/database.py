@@ -1,20 +1,196 @@
-from sqlalchemy import create_engine
+import logging
+import threading
+import time
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import config
 
+logger = logging.getLogger(__name__)
+
+
+class _TimedPoolMixin:
+    # Records how long callers wait to check a connection out of the pool
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    if url.startswith("sqlite"):
+        return {} if is_async else {"connect_args": {"check_same_thread": False}}
+
+    pool_size, max_overflow = config.get_pool_limits()
+    options = {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+    if config.DB_STATEMENT_TIMEOUT:
+        timeout = str(config.DB_STATEMENT_TIMEOUT)
+        options["connect_args"] = (
+            {"server_settings": {"statement_timeout": timeout}}
+            if is_async
+            else {"options": f"-c statement_timeout={timeout}"}
+        )
+
+    return options
+
+
+def get_sync_database_url(url: str) -> str:
+    # Pin psycopg2 (COPY ingestion relies on it) rather than the dialect default
+    if url.startswith("postgresql://"):
+        return "postgresql+psycopg2://" + url[len("postgresql://") :]
+    return url
 
-# Create engine
-engine = create_engine(
-    config.get_database_url(),
-    echo=config.DB_ECHO,
-    connect_args={"check_same_thread": False}
-    if config.DATABASE_URL and "sqlite" in config.DATABASE_URL
-    else {},
+
+def get_async_database_url(url: str) -> str:
+    # Swap the sync drivers for their asyncio counterparts
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://") :]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://") :]
+    return url
+
+
+def _refresh_credentials(dialect, connection_record, cargs, cparams):
+    # New connections use the cached secret, which is re-read from Secrets
+    # Manager once it expires so rotated passwords are picked up
+    credentials = config.get_secret()
+    cparams["user"] = credentials["username"]
+    cparams["password"] = credentials["password"]
+
+
+def _sqlite_connect(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _sqlite_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+
+# Engines are built on first use rather than at import, so importing the
+# app never resolves secrets or loads drivers
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+AsyncSessionLocal = (
+    async_sessionmaker(autoflush=False, expire_on_commit=False)
+    if config.DB_ASYNC
+    else None
 )
 
-# Create session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_engine() -> Engine:
+    global _engine
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = config.get_database_url()
+                engine = create_engine(
+                    get_sync_database_url(url),
+                    echo=config.DB_ECHO,
+                    **_engine_options(url),
+                )
+
+                if engine.dialect.name == "sqlite":
+                    # pysqlite commits implicitly before DDL and never opens
+                    # a transaction for it, take over transaction control so
+                    # DDL and savepoints behave like they do on Postgres
+                    event.listen(engine, "connect", _sqlite_connect)
+                    event.listen(engine, "begin", _sqlite_begin)
+                if config.uses_aws_secrets():
+                    event.listen(engine, "do_connect", _refresh_credentials)
+
+                _session_factory.configure(bind=engine)
+                _engine = engine
+
+    return _engine
+
+
+def SessionLocal() -> Session:
+    # Every session is made here, so it is bound even when no request has
+    # built the engine yet
+    get_engine()
+    return _session_factory()
+
+
+def get_async_engine() -> Optional[AsyncEngine]:
+    # Only built when the async backend is selected
+    global _async_engine
+
+    if _async_engine is None and config.DB_ASYNC:
+        with _engine_lock:
+            if _async_engine is None:
+                url = config.get_database_url()
+                engine = create_async_engine(
+                    get_async_database_url(url),
+                    echo=config.DB_ECHO,
+                    **_engine_options(url, is_async=True),
+                )
+
+                if config.uses_aws_secrets():
+                    event.listen(engine.sync_engine, "do_connect", _refresh_credentials)
+
+                AsyncSessionLocal.configure(bind=engine)
+                _async_engine = engine
+
+    return _async_engine
+
+
+async def dispose_engines():
+    global _engine, _async_engine
+
+    with _engine_lock:
+        engine, _engine = _engine, None
+        async_engine, _async_engine = _async_engine, None
+
+    if engine is not None:
+        engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 # Create base class
 Base = declarative_base()
@@ -29,13 +205,62 @@ def get_db():
         db.close()
 
 
+# Dependency for async DB session
+async def get_async_db():
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency for read endpoints, backed by whichever engine is configured
+get_read_db = get_async_db if config.DB_ASYNC else get_db
+
+
+async def execute(db, statement):
+    # Async sessions await the driver, sync ones run in the threadpool so
+    # the event loop is never blocked
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement)
+    return await run_in_threadpool(db.execute, statement)
+
+
+async def run_sync(db, fn, *args):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
+
+
+def get_pool_status(pool) -> dict:
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow_in_use=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+
+    if isinstance(pool, _TimedPoolMixin):
+        status.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.checkout_timeouts,
+            checkout_wait_avg_ms=pool.wait_total / pool.checkouts * 1000
+            if pool.checkouts
+            else 0.0,
+            checkout_wait_max_ms=pool.wait_max * 1000,
+        )
+
+    return status
+
+
 # Connection health check
-def check_database_connection():
+def check_database_connection() -> bool:
     try:
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
         return True
     except Exception as e:
-        print(f"Database connection failed: {str(e)}")
+        logger.warning("Database connection failed: %s", e)
         return False
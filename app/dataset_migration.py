@@ -0,0 +1,259 @@
+import argparse
+import logging
+import os
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable
+from sqlalchemy import Engine, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.config import config
+from app.database import SessionLocal, get_engine
+from app.models.database_models import Employee as DBEmployee
+from app.models.pydantic_models import (
+    DatasetMigrationResponse,
+    IngestionMode,
+    TableMigrationResult,
+)
+from app.services.csv_imports import load_departments, load_employees, load_jobs
+
+logger = logging.getLogger(__name__)
+
+# File names looked up when loading a directory, like data/
+DATASET_FILES = {
+    "departments": "departments.csv",
+    "jobs": "jobs.csv",
+    "employees": "hired_employees.csv",
+}
+
+
+def _load_table(
+    db: Session, table: str, importer: Callable, source
+) -> TableMigrationResult:
+    start = time.perf_counter()
+    try:
+        result = importer(db, source, [])
+    except pd.errors.EmptyDataError as e:
+        db.rollback()
+        raise pd.errors.EmptyDataError(f"{table}: CSV file is empty") from e
+    except ValueError as e:
+        db.rollback()
+        raise ValueError(f"{table}: {e}") from e
+    except Exception:
+        db.rollback()
+        raise
+    seconds = time.perf_counter() - start
+
+    rows = result.records_inserted + result.records_updated + result.records_rejected
+    logger.info("Loaded %s rows into %s in %.2fs", rows, table, seconds)
+    return TableMigrationResult(
+        table=table,
+        seconds=seconds,
+        rows_per_second=rows / seconds if seconds else 0.0,
+        result=result,
+    )
+
+
+def _load_reference_table(table: str, importer: Callable, source):
+    # Runs on its own thread, so it needs its own session
+    with SessionLocal() as db:
+        return _load_table(db, table, importer, source)
+
+
+def _check_employees_empty(connection: Connection):
+    # Dropping the indexes and foreign keys is only meant for initial loads,
+    # on a live table every other reader and writer would lose them too
+    if connection.execute(select(DBEmployee.id).limit(1)).first() is not None:
+        raise ValueError(
+            "Constraints can only be deferred while the employees table is empty"
+        )
+
+
+def _drop_employee_constraints(connection: Connection) -> list[dict]:
+    # Rows are still checked against the reference tables by the import
+    # itself, the database only re-checks them once at the end
+    if connection.dialect.name == "postgresql":
+        # Nothing may write between the check and the drops
+        connection.execute(text("LOCK TABLE employees IN ACCESS EXCLUSIVE MODE"))
+    _check_employees_empty(connection)
+
+    foreign_keys = []
+    if connection.dialect.name == "postgresql":
+        foreign_keys = inspect(connection).get_foreign_keys("employees")
+        for foreign_key in foreign_keys:
+            connection.execute(
+                text(f'ALTER TABLE employees DROP CONSTRAINT "{foreign_key["name"]}"')
+            )
+
+    # The primary key stays, upserts need it
+    for index in DBEmployee.__table__.indexes:
+        index.drop(connection, checkfirst=True)
+
+    return foreign_keys
+
+
+def _restore_employee_constraints(connection: Connection, foreign_keys: list[dict]):
+    for index in DBEmployee.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    # NOT VALID skips checking the existing rows, the constraint is only
+    # enforced for new writes until it is validated
+    for foreign_key in foreign_keys:
+        connection.execute(
+            text(
+                f'ALTER TABLE employees ADD CONSTRAINT "{foreign_key["name"]}" '
+                f"FOREIGN KEY ({', '.join(foreign_key['constrained_columns'])}) "
+                f"REFERENCES {foreign_key['referred_table']} "
+                f"({', '.join(foreign_key['referred_columns'])}) NOT VALID"
+            )
+        )
+
+
+def _validate_employee_constraints(connection: Connection, foreign_keys: list[dict]):
+    # Runs in its own transaction once the constraints are committed:
+    # VALIDATE only takes a SHARE UPDATE EXCLUSIVE lock, so reads and writes
+    # carry on while it scans, which they couldn't behind the ADD's lock
+    for foreign_key in foreign_keys:
+        connection.execute(
+            text(f'ALTER TABLE employees VALIDATE CONSTRAINT "{foreign_key["name"]}"')
+        )
+
+
+def _rebuild_employee_constraints(engine: Engine, foreign_keys: list[dict]):
+    with engine.begin() as connection:
+        _restore_employee_constraints(connection, foreign_keys)
+    with engine.begin() as connection:
+        _validate_employee_constraints(connection, foreign_keys)
+
+
+def migrate_dataset(
+    db: Session,
+    departments,
+    jobs,
+    employees,
+    mode: IngestionMode = IngestionMode.standard,
+    parallel: bool = False,
+    defer_constraints: bool = False,
+) -> DatasetMigrationResponse:
+    start = time.perf_counter()
+    engine = get_engine()
+
+    if defer_constraints:
+        # Fail before any table is loaded, it's checked again under the lock
+        with engine.connect() as connection:
+            _check_employees_empty(connection)
+
+    # Departments and jobs don't depend on each other, load them together.
+    # SQLite has a single writer, there they run one after the other
+    workers = 1 if engine.dialect.name == "sqlite" else 2
+    with ThreadPoolExecutor(workers, thread_name_prefix="migrate") as executor:
+        futures = [
+            executor.submit(
+                _load_reference_table,
+                "departments",
+                partial(load_departments, mode=mode),
+                departments,
+            ),
+            executor.submit(
+                _load_reference_table, "jobs", partial(load_jobs, mode=mode), jobs
+            ),
+        ]
+        tables = [future.result() for future in futures]
+
+    foreign_keys = None
+    constraint_seconds = 0.0
+    if defer_constraints:
+        deferred = time.perf_counter()
+        with engine.begin() as connection:
+            foreign_keys = _drop_employee_constraints(connection)
+        constraint_seconds += time.perf_counter() - deferred
+
+    # The reference imports invalidated the id caches, employees are
+    # checked against the freshly loaded sets
+    try:
+        tables.append(
+            _load_table(
+                db,
+                "employees",
+                partial(load_employees, mode=mode, parallel=parallel),
+                employees,
+            )
+        )
+    except BaseException:
+        if foreign_keys is not None:
+            # The load error is the one to report, a failed rebuild is only
+            # logged so it doesn't replace it
+            try:
+                _rebuild_employee_constraints(engine, foreign_keys)
+            except Exception:
+                logger.exception(
+                    "Could not restore the employee indexes and foreign keys "
+                    "after a failed load, they may be missing or NOT VALID"
+                )
+        raise
+
+    if foreign_keys is not None:
+        restored = time.perf_counter()
+        _rebuild_employee_constraints(engine, foreign_keys)
+        constraint_seconds += time.perf_counter() - restored
+
+    rejected = sum(table.result.records_rejected for table in tables)
+    return DatasetMigrationResponse(
+        message="Dataset migrated successfully"
+        if not rejected
+        else "Dataset migrated with errors",
+        tables=tables,
+        constraints_deferred=defer_constraints,
+        constraint_seconds=constraint_seconds,
+        wall_seconds=time.perf_counter() - start,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load departments, jobs and employees in foreign key order"
+    )
+    parser.add_argument(
+        "directory",
+        nargs="?",
+        default="data",
+        help=f"directory holding {', '.join(DATASET_FILES.values())}",
+    )
+    parser.add_argument("--mode", type=IngestionMode, default=IngestionMode.standard)
+    parser.add_argument("--parallel", action="store_true")
+    parser.add_argument("--defer-constraints", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if config.DB_AUTO_MIGRATE:
+        from app.schema_migrations import migrate
+
+        migrate(get_engine())
+
+    paths = {
+        table: os.path.join(args.directory, name)
+        for table, name in DATASET_FILES.items()
+    }
+    with (
+        open(paths["departments"], "rb") as departments,
+        open(paths["jobs"], "rb") as jobs,
+        open(paths["employees"], "rb") as employees,
+        SessionLocal() as db,
+    ):
+        report = migrate_dataset(
+            db,
+            departments,
+            jobs,
+            employees,
+            mode=args.mode,
+            parallel=args.parallel,
+            defer_constraints=args.defer_constraints,
+        )
+
+    print(report.model_dump_json(indent=2, by_alias=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+import cProfile
+import functools
+import heapq
+import inspect
+import io
+import logging
+import os
+import pstats
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qs
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import config
+from app.models.pydantic_models import StageTimings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route, including streamed response bodies",
+    ["method", "route", "status"],
+)
+REQUEST_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500, 1000, 5000),
+)
+REQUEST_SQL_TIME = Histogram(
+    "http_request_sql_duration_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+)
+STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Latency of every SQL statement, in or out of a request",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1, 5),
+)
+INGESTION_ROWS = Counter(
+    "ingestion_rows_total",
+    "Rows seen by the ingestion endpoints by outcome",
+    ["table", "source", "outcome"],
+)
+INGESTION_THROUGHPUT = Histogram(
+    "ingestion_rows_per_second",
+    "Throughput of each upload or batch",
+    ["table", "source"],
+    buckets=(100, 500, 1000, 5000, 10_000, 50_000, 100_000, 500_000, 1_000_000),
+)
+INGESTION_STAGE_TIME = Histogram(
+    "ingestion_stage_duration_seconds",
+    "Time spent per ingestion stage of each upload or batch",
+    ["table", "source", "stage"],
+)
+
+
+class RequestStats:
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.slowest: list[tuple[float, str]] = []
+
+    def record(self, seconds: float, statement: str):
+        self.statements += 1
+        self.sql_seconds += seconds
+
+        # Keep the worst statements only, as a min-heap
+        entry = (seconds, statement)
+        if len(self.slowest) < config.SLOW_REQUEST_STATEMENTS:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+
+# Set per request by the middleware; threadpool calls and async sessions
+# run with a copy of the context, so they update the same object
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_instrumentation_start", None)
+    if start is None:
+        return
+
+    seconds = time.perf_counter() - start
+    STATEMENT_LATENCY.observe(seconds)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(seconds, statement)
+
+
+# Listening on the Engine class covers the lazily built engines, the async
+# one included
+if config.METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware so streamed exports and
+    # NDJSON uploads are timed until their last byte
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - start
+            _request_stats.reset(token)
+            self._observe(scope, status, seconds, stats)
+
+    def _observe(self, scope, status: int, seconds: float, stats: RequestStats):
+        # Label by route template, unmatched paths would explode cardinality
+        route = scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        method = scope["method"]
+
+        REQUEST_LATENCY.labels(method, path, status).observe(seconds)
+        REQUEST_STATEMENTS.labels(method, path).observe(stats.statements)
+        REQUEST_SQL_TIME.labels(method, path).observe(stats.sql_seconds)
+
+        if config.SLOW_REQUEST_SECONDS and seconds >= config.SLOW_REQUEST_SECONDS:
+            worst = "".join(
+                f"\n  {duration * 1000:.1f}ms {' '.join(statement.split())[:500]}"
+                for duration, statement in sorted(stats.slowest, reverse=True)
+            )
+            logger.warning(
+                "Slow request %s %s: %d in %.3fs, %d statements in %.3fs%s",
+                method,
+                scope["path"],
+                status,
+                seconds,
+                stats.statements,
+                stats.sql_seconds,
+                worst,
+            )
+
+
+# Seconds per ingestion stage of the upload or batch being run
+_stage_timings: ContextVar[Optional[dict[str, float]]] = ContextVar(
+    "stage_timings", default=None
+)
+
+
+@contextmanager
+def stage(name: str):
+    timings = _stage_timings.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+def timed_stage(name: str, iterable):
+    # Times producing each item of a lazy iterable, like a chunked CSV reader
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+
+def record_ingestion(
+    table: str,
+    source: str,
+    seconds: float,
+    inserted: int,
+    updated: int = 0,
+    rejected: int = 0,
+):
+    parsed = inserted + updated + rejected
+    for outcome, rows in (
+        ("parsed", parsed),
+        ("inserted", inserted),
+        ("updated", updated),
+        ("rejected", rejected),
+    ):
+        INGESTION_ROWS.labels(table, source, outcome).inc(rows)
+
+    if seconds > 0 and parsed:
+        INGESTION_THROUGHPUT.labels(table, source).observe(parsed / seconds)
+
+
+def _record_response(
+    table: str, source: str, seconds: float, timings: dict[str, float], response
+):
+    # Reads the counts off UploadResponse, BatchResponse or StreamBatchResponse
+    for name, stage_seconds in timings.items():
+        INGESTION_STAGE_TIME.labels(table, source, name).observe(stage_seconds)
+    if "timings" in type(response).model_fields:
+        response.timings = StageTimings.model_validate(timings)
+
+    inserted = getattr(response, "records_inserted", None)
+    if inserted is None:
+        inserted = getattr(response, "records_processed", 0)
+
+    rejected = getattr(response, "records_rejected", None)
+    if rejected is None:
+        rejected = getattr(response, "records_processed", inserted) - inserted
+
+    record_ingestion(
+        table,
+        source,
+        seconds,
+        inserted,
+        getattr(response, "records_updated", 0) or 0,
+        rejected,
+    )
+
+
+def ingestion_metrics(table: str, source: str):
+    # Records the counts of whatever ingestion response the function returns
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                timings = {}
+                token = _stage_timings.set(timings)
+                start = time.perf_counter()
+                try:
+                    response = await fn(*args, **kwargs)
+                finally:
+                    _stage_timings.reset(token)
+                seconds = time.perf_counter() - start
+                _record_response(table, source, seconds, timings, response)
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timings = {}
+            token = _stage_timings.set(timings)
+            start = time.perf_counter()
+            try:
+                response = fn(*args, **kwargs)
+            finally:
+                _stage_timings.reset(token)
+            seconds = time.perf_counter() - start
+            _record_response(table, source, seconds, timings, response)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # Under several worker processes each one writes its samples to
+    # PROMETHEUS_MULTIPROC_DIR and they are merged here
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# Set by the profiling middleware when the request asked to be profiled,
+# the profiled endpoint stores the profile's file name in it
+_profile_target: ContextVar[Optional[dict]] = ContextVar("profile_target", default=None)
+
+
+def _profile_requested(scope) -> bool:
+    headers = dict(scope["headers"])
+    if headers.get(b"x-profile", b"").lower() in (b"1", b"true"):
+        return True
+
+    query = parse_qs(scope["query_string"].decode("latin-1"))
+    return query.get("profile", [""])[-1].lower() in ("1", "true")
+
+
+class ProfilingMiddleware:
+    # Only installed when PROFILING_ENABLED is set, never in production
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        target = {}
+        token = _profile_target.set(target)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and "file" in target:
+                headers = [*message.get("headers", [])]
+                headers.append((b"x-profile-file", target["file"].encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile_target.reset(token)
+
+
+def profiled(fn):
+    # cProfile only sees the thread it runs in, so the sync endpoint itself
+    # is wrapped rather than the request. Writes a .prof file for
+    # pstats/snakeviz and a text summary of the top functions next to it
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        target = _profile_target.get()
+        if target is None:
+            return fn(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(fn, *args, **kwargs)
+        finally:
+            os.makedirs(config.PROFILE_DIR, exist_ok=True)
+            name = f"{fn.__name__}-{uuid.uuid4().hex[:12]}"
+            profiler.dump_stats(os.path.join(config.PROFILE_DIR, f"{name}.prof"))
+
+            summary = io.StringIO()
+            stats = pstats.Stats(profiler, stream=summary)
+            stats.sort_stats("cumulative").print_stats(40)
+            with open(os.path.join(config.PROFILE_DIR, f"{name}.txt"), "w") as f:
+                f.write(summary.getvalue())
+
+            target["file"] = f"{name}.prof"
+            logger.info("Profile of %s written to %s", fn.__name__, name)
+
+    return wrapper
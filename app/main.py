@@ -1,19 +1,92 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import department, job, employee
-from app.database import Base, engine
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import InterfaceError, OperationalError
+from app.routers import (
+    department,
+    job,
+    employee,
+    imports,
+    health,
+    analytics,
+    metrics,
+    migrations,
+)
+from app.config import config
+from app.database import dispose_engines, get_async_engine, get_engine
+from app.instrumentation import MetricsMiddleware, ProfilingMiddleware
+from app.schema_migrations import migrate
+
+
+logger = logging.getLogger(__name__)
+
+
+def _migrate():
+    # Builds the engines off the event loop, resolving the secret if needed
+    get_async_engine()
+    migrate(get_engine())
+
 
+async def _retry_migrations(app: FastAPI):
+    delay = 1.0
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await run_in_threadpool(_migrate)
+        except (OperationalError, InterfaceError) as e:
+            delay = min(delay * 2, 30.0)
+            logger.warning("Database unavailable, retrying in %.0fs: %s", delay, e)
+        except Exception:
+            logger.exception("Schema migration failed")
+            return
+        else:
+            app.state.schema_ready = True
+            return
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bring the database schema up to date before serving requests. When the
+    # database can't be reached the app starts anyway, keeps retrying in the
+    # background and reports not ready until the migrations ran
+    app.state.schema_ready = not config.DB_AUTO_MIGRATE
+    retry = None
+    if config.DB_AUTO_MIGRATE:
+        try:
+            await run_in_threadpool(_migrate)
+            app.state.schema_ready = True
+        except (OperationalError, InterfaceError) as e:
+            logger.warning("Database unavailable at startup: %s", e)
+            retry = asyncio.create_task(_retry_migrations(app))
+
+    yield
+
+    if retry:
+        retry.cancel()
+    await dispose_engines()
 
 
 app = FastAPI(
     title="Data Migration API",
     description="REST API for migrating historical employee data from CSV to SQL database",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Include routers
 app.include_router(department.router)
 app.include_router(job.router)
 app.include_router(employee.router)
+app.include_router(imports.router)
+app.include_router(health.router)
+app.include_router(analytics.router)
+app.include_router(migrations.router)
+
+if config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
+
+if config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
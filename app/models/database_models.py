@@ -1,4 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -7,7 +16,7 @@ class Department(Base):
     __tablename__ = "departments"
 
     id = Column(Integer, primary_key=True, index=True)
-    department = Column(String, nullable=False)
+    department = Column(String, nullable=False, unique=True, index=True)
 
     # Relationship
     employees = relationship("Employee", back_populates="department")
@@ -20,7 +29,7 @@ class Job(Base):
     __tablename__ = "jobs"
 
     id = Column(Integer, primary_key=True, index=True)
-    job = Column(String, nullable=False)
+    job = Column(String, nullable=False, unique=True, index=True)
 
     # Relationship
     employees = relationship("Employee", back_populates="job")
@@ -31,12 +40,21 @@ class Job(Base):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        # Covers the analytics joins and also serves department_id lookups
+        Index(
+            "ix_employees_department_id_job_id_datetime",
+            "department_id",
+            "job_id",
+            "datetime",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
-    datetime = Column(DateTime, nullable=True)
+    datetime = Column(DateTime, nullable=True, index=True)
     department_id = Column(Integer, ForeignKey("departments.id"), nullable=True)
-    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True, index=True)
 
     # Relationships
     department = relationship("Department", back_populates="employees")
@@ -44,3 +62,76 @@ class Employee(Base):
 
     def __repr__(self):
         return f"<Employee(id={self.id}, name='{self.name}')>"
+
+
+class HiringSummary(Base):
+    __tablename__ = "hiring_summary"
+
+    # Hires per department, job and quarter, kept up to date by every write
+    # to employees. Employees without a department or job are counted under
+    # the reserved hiring_summary.UNASSIGNED id so the key columns can stay
+    # part of the primary key.
+    department_id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, primary_key=True)
+    year = Column(Integer, primary_key=True)
+    quarter = Column(Integer, primary_key=True)
+    hires = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<HiringSummary(department_id={self.department_id}, "
+            f"job_id={self.job_id}, year={self.year}, quarter={self.quarter}, "
+            f"hires={self.hires})>"
+        )
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    # Progress of a resumable upload, identified by the file's SHA-256.
+    # chunks_committed is updated in the same transaction as each chunk.
+    table_name = Column(String, primary_key=True)
+    content_hash = Column(String(64), primary_key=True)
+    chunk_size = Column(Integer, nullable=False)
+    # Ingestion mode of the attempt that committed the first chunk, the
+    # chunks only line up when a retry uses the same one
+    mode = Column(String(16), nullable=False, default="standard")
+    chunks_committed = Column(Integer, nullable=False, default=0)
+    records_inserted = Column(Integer, nullable=False, default=0)
+    records_updated = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    # The attempt currently processing the file, expires with the lease
+    owner = Column(String(32), nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<UploadSession(table_name='{self.table_name}', "
+            f"content_hash='{self.content_hash}', "
+            f"chunks_committed={self.chunks_committed}, completed={self.completed})>"
+        )
+
+
+class ImportJobRecord(Base):
+    __tablename__ = "import_jobs"
+
+    # Status of a background import, written by the worker running it so any
+    # worker can report it. Only the first errors are kept, finished jobs
+    # expire after IMPORT_JOB_TTL.
+    id = Column(String(32), primary_key=True)
+    table_name = Column(String, nullable=False)
+    status = Column(String(16), nullable=False)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)
+    detail = Column(String, nullable=True)
+    result = Column(JSON, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return (
+            f"<ImportJobRecord(id='{self.id}', table_name='{self.table_name}', "
+            f"status='{self.status}', rows_processed={self.rows_processed})>"
+        )
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import AliasChoices, BaseModel, Field, ConfigDict, field_validator
 from typing import Optional
 from datetime import datetime
+from enum import Enum
 
 # ###############################
 # Department Pydantic Models
@@ -55,7 +56,10 @@ class JobUpdate(JobBase):
 
 class EmployeeBase(BaseModel):
     name: Optional[str] = None
-    timestamp: Optional[datetime] = None
+    # Stored in the employees.datetime column
+    timestamp: Optional[datetime] = Field(
+        None, validation_alias=AliasChoices("timestamp", "datetime")
+    )
     department_id: Optional[int] = None
     job_id: Optional[int] = None
 
@@ -104,13 +108,136 @@ class JobWithEmployees(Job):
     model_config = ConfigDict(from_attributes=True)
 
 
+class IngestionMode(str, Enum):
+    standard = "standard"
+    copy = "copy"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    arrow = "arrow"
+
+
+class StageTimings(BaseModel):
+    # Seconds spent in each ingestion stage. Batch endpoints receive their
+    # records already parsed and validated by the request body
+    parse: float = 0.0
+    validate_: float = Field(0.0, alias="validate")
+    write: float = 0.0
+    commit: float = 0.0
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
 class UploadResponse(BaseModel):
     message: str
     records_inserted: int
     records_updated: int = 0
+    records_rejected: int = 0
     errors: Optional[list[str]] = None
+    rejects_url: Optional[str] = None
+    timings: Optional[StageTimings] = None
 
 
 class BatchResponse(BaseModel):
     message: str
     records_processed: int
+    timings: Optional[StageTimings] = None
+
+
+class SubBatchResult(BaseModel):
+    batch: int
+    first_line: int
+    last_line: int
+    records_received: int
+    records_inserted: int
+    errors: Optional[list[str]] = None
+
+
+class StreamBatchResponse(BaseModel):
+    message: str
+    records_processed: int
+    records_inserted: int
+    batches: list[SubBatchResult] = []
+
+
+class TableMigrationResult(BaseModel):
+    table: str
+    seconds: float
+    rows_per_second: float
+    result: UploadResponse
+
+
+class DatasetMigrationResponse(BaseModel):
+    message: str
+    tables: list[TableMigrationResult]
+    constraints_deferred: bool = False
+    # Time spent dropping and rebuilding employee indexes and foreign keys
+    constraint_seconds: float = 0.0
+    wall_seconds: float
+
+
+class ImportStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class ImportJobStatus(BaseModel):
+    id: str
+    table: str
+    status: ImportStatus
+    rows_processed: int = 0
+    rows_per_second: float = 0.0
+    error_count: int = 0
+    errors: list[str] = []
+    detail: Optional[str] = None
+    result: Optional[UploadResponse] = None
+
+
+class PoolStatus(BaseModel):
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow_in_use: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    checkout_timeouts: Optional[int] = None
+    checkout_wait_avg_ms: Optional[float] = None
+    checkout_wait_max_ms: Optional[float] = None
+
+
+class PoolStatusResponse(BaseModel):
+    sync: PoolStatus
+    async_: Optional[PoolStatus] = Field(None, alias="async")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    database: bool
+    schema_migrated: bool
+
+
+# ###############################
+# Analytics Pydantic Models
+# ###############################
+
+
+class QuarterlyHires(BaseModel):
+    department: str
+    job: str
+    q1: int = 0
+    q2: int = 0
+    q3: int = 0
+    q4: int = 0
+
+
+class DepartmentHires(BaseModel):
+    id: int
+    department: str
+    hired: int
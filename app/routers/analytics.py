@@ -0,0 +1,95 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List
+from app.database import execute, get_db, get_read_db
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import HiringSummary
+from app.models.database_models import Job as DBJob
+from app.models.pydantic_models import BatchResponse, DepartmentHires, QuarterlyHires
+from app.services import hiring_summary
+
+router = APIRouter(
+    prefix="/api/v1/analytics",
+    tags=["analytics"],
+)
+
+
+@router.get("/hires-by-quarter", response_model=List[QuarterlyHires])
+async def get_hires_by_quarter(
+    year: int = Query(2021, description="Hiring year"),
+    db=Depends(get_read_db),
+):
+    # Hires for each department and job, divided by quarter and ordered
+    # alphabetically, read from the hiring summary instead of employees
+    quarters = [
+        func.sum(case((HiringSummary.quarter == quarter, HiringSummary.hires), else_=0))
+        for quarter in range(1, 5)
+    ]
+    result = await execute(
+        db,
+        select(DBDepartment.department, DBJob.job, *quarters)
+        .join(DBDepartment, DBDepartment.id == HiringSummary.department_id)
+        .join(DBJob, DBJob.id == HiringSummary.job_id)
+        .where(HiringSummary.year == year)
+        .group_by(DBDepartment.department, DBJob.job)
+        .having(func.sum(HiringSummary.hires) > 0)
+        .order_by(DBDepartment.department, DBJob.job),
+    )
+
+    return [
+        QuarterlyHires(department=department, job=job, q1=q1, q2=q2, q3=q3, q4=q4)
+        for department, job, q1, q2, q3, q4 in result
+    ]
+
+
+@router.get("/departments-above-mean", response_model=List[DepartmentHires])
+async def get_departments_above_mean(
+    year: int = Query(2021, description="Hiring year"),
+    db=Depends(get_read_db),
+):
+    # Departments that hired more than the mean of all departments that year,
+    # departments without hires count as zero towards the mean
+    hires = (
+        select(
+            HiringSummary.department_id,
+            func.sum(HiringSummary.hires).label("hired"),
+        )
+        .where(HiringSummary.year == year)
+        .group_by(HiringSummary.department_id)
+        .subquery()
+    )
+    result = await execute(
+        db,
+        select(
+            DBDepartment.id, DBDepartment.department, func.coalesce(hires.c.hired, 0)
+        ).outerjoin(hires, hires.c.department_id == DBDepartment.id),
+    )
+    departments = [
+        DepartmentHires(id=id_, department=name, hired=hired)
+        for id_, name, hired in result
+    ]
+
+    if not departments:
+        return []
+
+    mean = sum(d.hired for d in departments) / len(departments)
+    return sorted(
+        (d for d in departments if d.hired > mean),
+        key=lambda d: d.hired,
+        reverse=True,
+    )
+
+
+@router.post("/rebuild", response_model=BatchResponse)
+def rebuild_hiring_summary(db: Session = Depends(get_db)):
+    # Only needed for data written before the summary existed or outside
+    # the API
+    try:
+        rows = hiring_summary.rebuild(db)
+        db.commit()
+        return BatchResponse(message="Hiring summary rebuilt", records_processed=rows)
+    except SQLAlchemyError:
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Database error occurred")
@@ -1,18 +1,53 @@
-import io
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Depends, Query, Response, UploadFile, File
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    File,
+)
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List
-from app.database import get_db
+from functools import partial
+from bisect import bisect_right
+from operator import itemgetter
+from typing import List, Optional, Union
+from app.config import config
+from app.database import execute, get_db, get_read_db, run_sync
 from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Employee as DBEmployee
 from app.models.pydantic_models import (
     Department,
     DepartmentCreate,
     DepartmentUpdate,
     DepartmentWithEmployees,
+    EmployeeBasic,
     UploadResponse,
     BatchResponse,
+    StreamBatchResponse,
+    IngestionMode,
+    ExportFormat,
+    ImportJobStatus,
+)
+from app.instrumentation import ingestion_metrics, profiled, stage
+from app.services.copy_ingestion import supports_copy
+from app.services.export import export_response
+from app.services.hiring_summary import unassign
+from app.services.csv_imports import load_departments
+from app.services.import_jobs import submit_import
+from app.services.ndjson_batch import NDJSON_REQUEST_BODY, insert_ndjson_batches
+from app.services.parsing import RowError
+from app.services.pagination import resolve_cursor, set_next_cursor
+from app.services.reference_cache import departments_cache
+from app.services.response_cache import (
+    cached_response,
+    departments_responses,
+    jobs_responses,
 )
 
 router = APIRouter(
@@ -20,62 +55,116 @@ router = APIRouter(
     tags=["departments"],
 )
 
+DEPARTMENT_LIST = TypeAdapter(List[Department])
+DEPARTMENT_DETAIL = TypeAdapter(DepartmentWithEmployees)
+
 
 @router.get("/", response_model=List[Department])
 async def get_all_departments(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=1000, description="Maximum number of records to return"
     ),
-    db: Session = Depends(get_db),
+    after: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
+    ),
+    db=Depends(get_read_db),
+):
+    after_id = resolve_cursor(skip, after)
+
+    async def build(response: Response) -> list[Department]:
+        # Served from the reference cache, a cache hit never touches the database
+        entries = await run_sync(db, departments_cache.entries)
+        start = skip
+        if after_id is not None:
+            start = bisect_right(entries, after_id, key=itemgetter(0))
+
+        page = entries[start : start + limit]
+        set_next_cursor(response, [id_ for id_, _ in page], limit)
+        return [Department(id=id_, department=name) for id_, name in page]
+
+    return await cached_response(departments_responses, request, DEPARTMENT_LIST, build)
+
+
+@router.get("/export")
+def export_departments(
+    format: ExportFormat = Query(
+        ExportFormat.ndjson, description="ndjson, csv or arrow (Arrow IPC stream)"
+    ),
 ):
-    departments = db.query(DBDepartment).offset(skip).limit(limit).all()
-    return departments
+    # Streams the whole table with memory bounded by EXPORT_BATCH_SIZE
+    return export_response("departments", format)
 
 
 @router.get("/{department_id}", response_model=DepartmentWithEmployees)
-async def get_department(department_id: int, db: Session = Depends(get_db)):
-    department = db.query(DBDepartment).filter(DBDepartment.id == department_id).first()
+async def get_department(
+    request: Request,
+    department_id: int,
+    employees_skip: int = Query(0, ge=0, description="Number of employees to skip"),
+    employees_limit: int = Query(
+        100, ge=1, le=1000, description="Maximum number of employees to embed"
+    ),
+    db=Depends(get_read_db),
+):
+    async def build(response: Response) -> DepartmentWithEmployees:
+        result = await execute(
+            db, select(DBDepartment).where(DBDepartment.id == department_id)
+        )
+        department = result.scalar_one_or_none()
+
+        if not department:
+            raise HTTPException(status_code=404, detail="Department not found")
 
-    if not department:
-        raise HTTPException(status_code=404, detail="Department not found")
+        # The embedded list is paged in its own query instead of loading the
+        # whole relationship
+        employees = await execute(
+            db,
+            select(DBEmployee)
+            .where(DBEmployee.department_id == department_id)
+            .order_by(DBEmployee.id)
+            .offset(employees_skip)
+            .limit(employees_limit),
+        )
+
+        return DepartmentWithEmployees(
+            id=department.id,
+            department=department.department,
+            employees=[
+                EmployeeBasic.model_validate(employee)
+                for employee in employees.scalars()
+            ],
+        )
 
-    return department
+    return await cached_response(
+        departments_responses, request, DEPARTMENT_DETAIL, build
+    )
 
 
 @router.post("/", response_model=Department, status_code=201)
-async def create_department(
+def create_department(
     department: DepartmentCreate,
     db: Session = Depends(get_db),
 ):
     try:
-        # Check if department name already exists
-        existing = (
-            db.query(DBDepartment)
-            .filter(DBDepartment.department == department.department)
-            .first()
-        )
-
-        if existing:
-            raise HTTPException(
-                status_code=400, detail="Department name already exists"
-            )
-
+        # Name uniqueness is enforced by the unique index on departments.department
         db_department = DBDepartment(**department.model_dump())
         db.add(db_department)
         db.commit()
+        departments_cache.invalidate()
+        departments_responses.invalidate()
         db.refresh(db_department)
         return db_department
     except IntegrityError:
         db.rollback()
-        raise HTTPException(status_code=400, detail="Database constraint violation")
+        raise HTTPException(status_code=400, detail="Department name already exists")
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
 @router.put("/{department_id}", response_model=Department)
-async def update_department(
+def update_department(
     department_id: int,
     department: DepartmentUpdate,
     db: Session = Depends(get_db),
@@ -88,36 +177,26 @@ async def update_department(
         if not db_department:
             raise HTTPException(status_code=404, detail="Department not found")
 
-        # Check name uniqueness if name is being updated
-        if department.department and department.department != db_department.department:
-            existing = (
-                db.query(DBDepartment)
-                .filter(DBDepartment.department == department.department)
-                .first()
-            )
-            if existing:
-                raise HTTPException(
-                    status_code=400, detail="Department name already exists"
-                )
-
         # Update only provided fields
         update_data = department.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_department, field, value)
 
         db.commit()
+        departments_cache.invalidate()
+        departments_responses.invalidate()
         db.refresh(db_department)
         return db_department
     except IntegrityError:
         db.rollback()
-        raise HTTPException(status_code=400, detail="Database constraint violation")
+        raise HTTPException(status_code=400, detail="Department name already exists")
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
 @router.delete("/{department_id}", status_code=204)
-async def delete_department(
+def delete_department(
     department_id: int,
     db: Session = Depends(get_db),
 ):
@@ -129,8 +208,14 @@ async def delete_department(
         if not db_department:
             raise HTTPException(status_code=404, detail="Department not found")
 
+        # Its employees are left without a department, move their hires with them
+        unassign(db, "department_id", department_id)
         db.delete(db_department)
         db.commit()
+        departments_cache.invalidate()
+        departments_responses.invalidate()
+        # Employees embedded in jobs responses lost their department
+        jobs_responses.invalidate()
         return Response(status_code=204)
     except IntegrityError:
         db.rollback()
@@ -140,9 +225,17 @@ async def delete_department(
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_departments_csv(
+@router.post("/upload", response_model=Union[UploadResponse, ImportJobStatus])
+@profiled
+def upload_departments_csv(
+    response: Response,
     file: UploadFile = File(...),
+    mode: IngestionMode = Query(
+        IngestionMode.standard, description="Ingestion strategy for the file"
+    ),
+    run_async: bool = Query(
+        False, alias="async", description="Run the import as a background job"
+    ),
     db: Session = Depends(
         get_db,
     ),
@@ -150,65 +243,60 @@ async def upload_departments_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
-    try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")), header=None)
-        df.columns = ["id", "department"]
-
-        # Validate data
-        if df.isnull().any().any():
-            raise HTTPException(status_code=400, detail="CSV contains null values")
-
-        records_inserted = 0
-        records_updated = 0
-
-        for _, row in df.iterrows():
-            existing = (
-                db.query(DBDepartment).filter(DBDepartment.id == int(row["id"])).first()
-            )
-
-            if existing:
-                existing.department = row["department"]
-                records_updated += 1
-            else:
-                dept = DBDepartment(id=int(row["id"]), department=row["department"])
-                db.add(dept)
-                records_inserted += 1
-
-        db.commit()
+    if mode == IngestionMode.copy and not supports_copy(db):
+        raise HTTPException(
+            status_code=400, detail="COPY ingestion requires a PostgreSQL database"
+        )
 
-        return UploadResponse(
-            message="Departments uploaded successfully",
-            records_inserted=records_inserted,
-            records_updated=records_updated,
+    if run_async:
+        response.status_code = 202
+        return submit_import(
+            "departments", file.file, partial(load_departments, mode=mode)
         )
+
+    try:
+        return load_departments(db, file.file, [], mode=mode)
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
 @router.post("/upload/batch", response_model=BatchResponse)
+@profiled
+@ingestion_metrics("departments", "batch")
 def batch_insert_departments(
     departments: List[Department], db: Session = Depends(get_db)
 ):
-    if len(departments) < 1 or len(departments) > 1000:
+    if len(departments) < 1 or len(departments) > config.BATCH_MAX_RECORDS:
         raise HTTPException(
-            status_code=400, detail="Batch size must be between 1 and 1000 records"
+            status_code=400,
+            detail=f"Batch size must be between 1 and {config.BATCH_MAX_RECORDS} records",
         )
 
     try:
         records_inserted = 0
         bulk_dept = []
 
-        for dept_data in departments:
-            dept = DBDepartment(**dept_data.model_dump())
-            bulk_dept.append(dept)
-            records_inserted += 1
+        with stage("validate"):
+            for dept_data in departments:
+                dept = DBDepartment(**dept_data.model_dump())
+                bulk_dept.append(dept)
+                records_inserted += 1
 
-        db.bulk_save_objects(bulk_dept)
-        db.commit()
+        with stage("write"):
+            db.bulk_save_objects(bulk_dept)
+        with stage("commit"):
+            db.commit()
+        departments_cache.invalidate()
+        departments_responses.invalidate()
 
         return BatchResponse(
             message="Batch insert successful", records_processed=records_inserted
@@ -217,3 +305,41 @@ def batch_insert_departments(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _insert_departments(
+    db: Session, departments: list[tuple[int, Department]], errors: list[RowError]
+) -> int:
+    db.execute(
+        insert(DBDepartment), [department.model_dump() for _, department in departments]
+    )
+    return len(departments)
+
+
+@router.post(
+    "/upload/batch/ndjson",
+    response_model=StreamBatchResponse,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+@ingestion_metrics("departments", "ndjson")
+async def batch_insert_departments_ndjson(
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=10000,
+        description="Records per sub-batch, defaults to NDJSON_SUB_BATCH_SIZE",
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        return await insert_ndjson_batches(
+            request,
+            db,
+            Department,
+            _insert_departments,
+            batch_size or config.NDJSON_SUB_BATCH_SIZE,
+        )
+    finally:
+        departments_cache.invalidate()
+        departments_responses.invalidate()
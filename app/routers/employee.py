@@ -1,18 +1,46 @@
-import io
+import orjson
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    File,
+)
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List
-from app.database import get_db
-from app.models.database_models import Employee as DBEmployee
+from functools import partial
+from typing import List, Optional, Union
+from app.config import config
+from app.database import execute, get_db, get_read_db
 from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Employee as DBEmployee
 from app.models.database_models import Job as DBJob
 from app.models.pydantic_models import (
     Employee,
     UploadResponse,
     BatchResponse,
+    StreamBatchResponse,
+    IngestionMode,
+    ExportFormat,
+    ImportJobStatus,
 )
+from app.instrumentation import ingestion_metrics, profiled, stage
+from app.services.copy_ingestion import supports_copy
+from app.services.export import export_response
+from app.services.hiring_summary import apply_deltas, count_hires
+from app.services.response_cache import invalidate_employee_responses
+from app.services.csv_imports import load_employees
+from app.services.import_jobs import submit_import
+from app.services.ingestion import filter_foreign_keys
+from app.services.ndjson_batch import NDJSON_REQUEST_BODY, insert_ndjson_batches
+from app.services.upload_sessions import UploadInProgress, hash_file
+from app.services.parsing import RowError
+from app.services.pagination import resolve_cursor, set_next_cursor
+from app.services.reference_cache import departments_cache, jobs_cache
 
 router = APIRouter(
     prefix="/api/v1/employees",
@@ -20,33 +48,99 @@ router = APIRouter(
 )
 
 
-def parse_datetime_from_csv(dt_str: str) -> datetime:
-    if not dt_str or dt_str.strip() == "":
-        return None
-
-    try:
-        # Remove 'Z' and parse
-        dt_str_cleaned = dt_str.replace("Z", "+00:00")
-        return datetime.fromisoformat(dt_str_cleaned).replace(tzinfo=None)
-    except Exception as e:
-        return None
-
-
 @router.get("/", response_model=List[Employee])
 async def get_all_employees(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=1000, description="Maximum number of records to return"
     ),
-    db: Session = Depends(get_db),
+    after: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
+    ),
+    db=Depends(get_read_db),
 ):
-    employees = db.query(DBEmployee).offset(skip).limit(limit).all()
-    return employees
+    after_id = resolve_cursor(skip, after)
+
+    # Plain column tuples, the department and job names come from outer joins
+    statement = (
+        select(
+            DBEmployee.id,
+            DBEmployee.name,
+            DBEmployee.datetime,
+            DBEmployee.department_id,
+            DBEmployee.job_id,
+            DBDepartment.department,
+            DBJob.job,
+        )
+        .outerjoin(DBDepartment, DBDepartment.id == DBEmployee.department_id)
+        .outerjoin(DBJob, DBJob.id == DBEmployee.job_id)
+        .order_by(DBEmployee.id)
+        .limit(limit)
+    )
+
+    # Keyset pagination seeks straight to the cursor through the primary key
+    if after_id is not None:
+        statement = statement.where(DBEmployee.id > after_id)
+    else:
+        statement = statement.offset(skip)
+
+    rows = (await execute(db, statement)).all()
+
+    # Rows read from our own tables don't need validating, serialize them
+    # straight to the Employee shape
+    response = Response(
+        content=orjson.dumps(
+            [
+                {
+                    "name": name,
+                    "timestamp": hired,
+                    "department_id": department_id,
+                    "job_id": job_id,
+                    "id": id_,
+                    "department": {"department": department, "id": department_id}
+                    if department is not None
+                    else None,
+                    "job": {"job": job, "id": job_id} if job is not None else None,
+                }
+                for id_, name, hired, department_id, job_id, department, job in rows
+            ]
+        ),
+        media_type="application/json",
+    )
+    set_next_cursor(response, [row[0] for row in rows], limit)
+    return response
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_jobs_csv(
+@router.get("/export")
+def export_employees(
+    format: ExportFormat = Query(
+        ExportFormat.ndjson, description="ndjson, csv or arrow (Arrow IPC stream)"
+    ),
+):
+    # Streams the whole table with memory bounded by EXPORT_BATCH_SIZE
+    return export_response("employees", format)
+
+
+@router.post("/upload", response_model=Union[UploadResponse, ImportJobStatus])
+@profiled
+def upload_jobs_csv(
+    response: Response,
     file: UploadFile = File(...),
+    mode: IngestionMode = Query(
+        IngestionMode.standard, description="Ingestion strategy for the file"
+    ),
+    run_async: bool = Query(
+        False, alias="async", description="Run the import as a background job"
+    ),
+    parallel: bool = Query(
+        False, description="Parse and validate the file across a process pool"
+    ),
+    content_hash: Optional[str] = Query(
+        None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="SHA-256 of the file, makes the upload resumable and "
+        "re-uploads of the same file a no-op",
+    ),
     db: Session = Depends(
         get_db,
     ),
@@ -54,157 +148,119 @@ async def upload_jobs_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
-    try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")), header=None)
-        df.columns = ["id", "name", "datetime", "department_id", "job_id"]
-
-        records_inserted = 0
-        records_updated = 0
-        errors = []
-
-        # Process in chunks for better memory management
-        chunk_size = 1000
-        for i in range(0, len(df), chunk_size):
-            chunk = df.iloc[i : i + chunk_size]
-
-            for idx, row in chunk.iterrows():
-                try:
-                    # Validate foreign keys
-                    if pd.notna(row["department_id"]):
-                        dept = (
-                            db.query(DBDepartment)
-                            .filter(DBDepartment.id == int(row["department_id"]))
-                            .first()
-                        )
-                        if not dept:
-                            errors.append(
-                                f"Row {idx}: Department ID {int(row['department_id'])} not found"
-                            )
-                            continue
-
-                    if pd.notna(row["job_id"]):
-                        job = (
-                            db.query(DBJob)
-                            .filter(DBJob.id == int(row["job_id"]))
-                            .first()
-                        )
-                        if not job:
-                            errors.append(
-                                f"Row {idx}: Job ID {int(row['job_id'])} not found"
-                            )
-                            continue
-
-                    # Parse datetime from ISO format
-                    hire_datetime = None
-                    if pd.notna(row["datetime"]):
-                        hire_datetime = parse_datetime_from_csv(str(row["datetime"]))
-
-                    existing = (
-                        db.query(DBEmployee)
-                        .filter(DBEmployee.id == int(row["id"]))
-                        .first()
-                    )
-                    if existing:
-                        existing.name = row["name"] if pd.notna(row["name"]) else None
-                        existing.datetime = (
-                            hire_datetime if pd.notna(row["datetime"]) else None
-                        )
-                        existing.department_id = (
-                            int(row["department_id"])
-                            if pd.notna(row["department_id"])
-                            else None
-                        )
-                        existing.job_id = (
-                            int(row["job_id"]) if pd.notna(row["job_id"]) else None
-                        )
-                        records_updated += 1
-                    else:
-                        emp = DBEmployee(
-                            id=int(row["id"]),
-                            name=row["name"] if pd.notna(row["name"]) else None,
-                            datetime=hire_datetime
-                            if pd.notna(row["datetime"])
-                            else None,
-                            department_id=int(row["department_id"])
-                            if pd.notna(row["department_id"])
-                            else None,
-                            job_id=int(row["job_id"])
-                            if pd.notna(row["job_id"])
-                            else None,
-                        )
-
-                        db.add(emp)
-                        records_inserted += 1
-
-                except Exception as e:
-                    errors.append(f"Row {idx}: {str(e)}")
-
-            db.commit()
+    if mode == IngestionMode.copy and not supports_copy(db):
+        raise HTTPException(
+            status_code=400, detail="COPY ingestion requires a PostgreSQL database"
+        )
 
-        response = UploadResponse(
-            message="Employees uploaded successfully"
-            if not errors
-            else "Employees uploaded with errors",
-            records_inserted=records_inserted,
-            records_updated=records_updated,
+    if mode == IngestionMode.copy and parallel:
+        raise HTTPException(
+            status_code=400, detail="Parallel parsing is not available in COPY mode"
         )
 
-        if errors:
-            response.errors = errors[:10]  # Return first 10 errors
+    if content_hash:
+        if parallel:
+            raise HTTPException(
+                status_code=400,
+                detail="Resumable uploads are not available with parallel parsing",
+            )
+
+        if hash_file(file.file) != content_hash.lower():
+            raise HTTPException(
+                status_code=400, detail="Content hash does not match the file"
+            )
 
-        return response
+    if run_async:
+        response.status_code = 202
+        return submit_import(
+            "employees",
+            file.file,
+            partial(
+                load_employees,
+                mode=mode,
+                parallel=parallel,
+                content_hash=content_hash,
+            ),
+        )
 
+    try:
+        return load_employees(
+            db,
+            file.file,
+            [],
+            mode=mode,
+            parallel=parallel,
+            content_hash=content_hash,
+        )
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
+    except UploadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
 @router.post("/upload/batch", response_model=BatchResponse)
+@profiled
+@ingestion_metrics("employees", "batch")
 def batch_insert_employees(employees: List[Employee], db: Session = Depends(get_db)):
-    if len(employees) < 1 or len(employees) > 1000:
+    if len(employees) < 1 or len(employees) > config.BATCH_MAX_RECORDS:
         raise HTTPException(
             status_code=400,
-            detail="Batch size must be between 1 and 1000 records",
+            detail=f"Batch size must be between 1 and {config.BATCH_MAX_RECORDS} records",
         )
 
     try:
-        # Validate foreign keys
-        for emp in employees:
-            if emp.department_id:
-                dept = (
-                    db.query(DBDepartment)
-                    .filter(DBDepartment.id == emp.department_id)
-                    .first()
+        with stage("validate"):
+            # Validate foreign keys against the cached reference id sets
+            missing_departments = departments_cache.missing(
+                db, {emp.department_id for emp in employees if emp.department_id}
+            )
+            if missing_departments:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Department ID {min(missing_departments)} not found",
                 )
-                if not dept:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Department ID {emp.department_id} not found",
-                    )
-
-            if emp.job_id:
-                job = db.query(DBJob).filter(DBJob.id == emp.job_id).first()
-                if not job:
-                    raise HTTPException(
-                        status_code=400, detail=f"Job ID {emp.job_id} not found"
-                    )
-
-        records_inserted = 0
-        bulk_data = []
-        for emp_data in employees:
-            emp_dict = emp.model_dump()
-            emp_dict["datetime"] = datetime.fromisoformat(
-                emp_dict["datetime"].replace("Z", "+00:00")
+
+            missing_jobs = jobs_cache.missing(
+                db, {emp.job_id for emp in employees if emp.job_id}
             )
-            emp = Employee(**emp_data.model_dump())
-            bulk_data.append(emp)
-            records_inserted += 1
+            if missing_jobs:
+                raise HTTPException(
+                    status_code=400, detail=f"Job ID {min(missing_jobs)} not found"
+                )
 
-        db.bulk_save_objects(bulk_data)
-        db.commit()
+            records_inserted = 0
+            bulk_data = []
+            for emp_data in employees:
+                emp = DBEmployee(
+                    id=emp_data.id,
+                    name=emp_data.name,
+                    datetime=emp_data.timestamp,
+                    department_id=emp_data.department_id,
+                    job_id=emp_data.job_id,
+                )
+                bulk_data.append(emp)
+                records_inserted += 1
+
+        with stage("write"):
+            db.bulk_save_objects(bulk_data)
+            apply_deltas(
+                db,
+                count_hires(
+                    (emp.department_id, emp.job_id, emp.timestamp) for emp in employees
+                ),
+            )
+        with stage("commit"):
+            db.commit()
+        invalidate_employee_responses()
 
         return BatchResponse(
             message="Batch insert successful", records_processed=records_inserted
@@ -215,3 +271,66 @@ def batch_insert_employees(employees: List[Employee], db: Session = Depends(get_
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _insert_employees(
+    db: Session, employees: list[tuple[int, Employee]], errors: list[RowError]
+) -> int:
+    # Rows with unknown departments or jobs are reported and skipped
+    records = filter_foreign_keys(
+        db,
+        [
+            (
+                line_number,
+                {
+                    "id": emp.id,
+                    "name": emp.name,
+                    "datetime": emp.timestamp,
+                    "department_id": emp.department_id,
+                    "job_id": emp.job_id,
+                },
+            )
+            for line_number, emp in employees
+        ],
+        errors,
+    )
+    if not records:
+        return 0
+
+    db.execute(insert(DBEmployee), [record for _, record in records])
+    apply_deltas(
+        db,
+        count_hires(
+            (record["department_id"], record["job_id"], record["datetime"])
+            for _, record in records
+        ),
+    )
+    return len(records)
+
+
+@router.post(
+    "/upload/batch/ndjson",
+    response_model=StreamBatchResponse,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+@ingestion_metrics("employees", "ndjson")
+async def batch_insert_employees_ndjson(
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=10000,
+        description="Records per sub-batch, defaults to NDJSON_SUB_BATCH_SIZE",
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        return await insert_ndjson_batches(
+            request,
+            db,
+            Employee,
+            _insert_employees,
+            batch_size or config.NDJSON_SUB_BATCH_SIZE,
+        )
+    finally:
+        invalidate_employee_responses()
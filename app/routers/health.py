@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from app.database import (
+    check_database_connection,
+    get_async_engine,
+    get_engine,
+    get_pool_status,
+)
+from app.models.pydantic_models import (
+    PoolStatus,
+    PoolStatusResponse,
+    ReadinessResponse,
+)
+
+router = APIRouter(
+    prefix="/api/v1/health",
+    tags=["health"],
+)
+
+
+@router.get("/pool", response_model=PoolStatusResponse, response_model_by_alias=True)
+def get_pool_metrics():
+    # Building the engines on first use may fetch the AWS secret, so this
+    # runs in the threadpool rather than on the event loop
+    async_engine = get_async_engine()
+    return PoolStatusResponse(
+        sync=PoolStatus(**get_pool_status(get_engine().pool)),
+        async_=PoolStatus(**get_pool_status(async_engine.pool))
+        if async_engine
+        else None,
+    )
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def get_readiness(request: Request, response: Response):
+    # Load balancers should only route here once the database answers and
+    # the schema is migrated
+    database = await run_in_threadpool(check_database_connection)
+    schema = request.app.state.schema_ready
+    ready = database and schema
+
+    if not ready:
+        response.status_code = 503
+
+    return ReadinessResponse(
+        status="ready" if ready else "unavailable",
+        database=database,
+        schema_migrated=schema,
+    )
@@ -0,0 +1,34 @@
+import os
+from fastapi import APIRouter, HTTPException, Path
+from fastapi.responses import FileResponse
+from app.models.pydantic_models import ImportJobStatus
+from app.services.import_jobs import get_import
+from app.services.rejects import reject_expired, reject_path
+
+router = APIRouter(
+    prefix="/api/v1/imports",
+    tags=["imports"],
+)
+
+
+@router.get("/{import_id}", response_model=ImportJobStatus)
+def get_import_status(import_id: str):
+    job = get_import(import_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    return job
+
+
+@router.get("/rejects/{reject_id}", response_class=FileResponse)
+async def download_rejects(reject_id: str = Path(..., pattern="^[0-9a-f]{32}$")):
+    path = reject_path(reject_id)
+
+    # Expired files may not have been deleted yet
+    if not os.path.isfile(path) or reject_expired(path):
+        raise HTTPException(status_code=404, detail="Reject file not found")
+
+    return FileResponse(
+        path, media_type="text/csv", filename=f"rejects-{reject_id}.csv"
+    )
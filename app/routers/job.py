@@ -1,18 +1,53 @@
-import io
 import pandas as pd
-from fastapi import APIRouter, HTTPException, Depends, Query, Response, UploadFile, File
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    File,
+)
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from typing import List
-from app.database import get_db
+from functools import partial
+from bisect import bisect_right
+from operator import itemgetter
+from typing import List, Optional, Union
+from app.config import config
+from app.database import execute, get_db, get_read_db, run_sync
 from app.models.database_models import Job as DBJob
+from app.models.database_models import Employee as DBEmployee
 from app.models.pydantic_models import (
     Job,
     JobCreate,
     JobUpdate,
     JobWithEmployees,
+    EmployeeBasic,
     UploadResponse,
     BatchResponse,
+    StreamBatchResponse,
+    IngestionMode,
+    ExportFormat,
+    ImportJobStatus,
+)
+from app.instrumentation import ingestion_metrics, profiled, stage
+from app.services.copy_ingestion import supports_copy
+from app.services.export import export_response
+from app.services.hiring_summary import unassign
+from app.services.csv_imports import load_jobs
+from app.services.import_jobs import submit_import
+from app.services.ndjson_batch import NDJSON_REQUEST_BODY, insert_ndjson_batches
+from app.services.parsing import RowError
+from app.services.pagination import resolve_cursor, set_next_cursor
+from app.services.reference_cache import jobs_cache
+from app.services.response_cache import (
+    cached_response,
+    departments_responses,
+    jobs_responses,
 )
 
 router = APIRouter(
@@ -20,56 +55,112 @@ router = APIRouter(
     tags=["jobs"],
 )
 
+JOB_LIST = TypeAdapter(List[Job])
+JOB_DETAIL = TypeAdapter(JobWithEmployees)
+
 
 @router.get("/", response_model=List[Job])
 async def get_all_jobs(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=1000, description="Maximum number of records to return"
     ),
-    db: Session = Depends(get_db),
+    after: Optional[str] = Query(
+        None, description="Cursor from the X-Next-Cursor header of the previous page"
+    ),
+    db=Depends(get_read_db),
+):
+    after_id = resolve_cursor(skip, after)
+
+    async def build(response: Response) -> list[Job]:
+        # Served from the reference cache, a cache hit never touches the database
+        entries = await run_sync(db, jobs_cache.entries)
+        start = skip
+        if after_id is not None:
+            start = bisect_right(entries, after_id, key=itemgetter(0))
+
+        page = entries[start : start + limit]
+        set_next_cursor(response, [id_ for id_, _ in page], limit)
+        return [Job(id=id_, job=name) for id_, name in page]
+
+    return await cached_response(jobs_responses, request, JOB_LIST, build)
+
+
+@router.get("/export")
+def export_jobs(
+    format: ExportFormat = Query(
+        ExportFormat.ndjson, description="ndjson, csv or arrow (Arrow IPC stream)"
+    ),
 ):
-    jobs = db.query(DBJob).offset(skip).limit(limit).all()
-    return jobs
+    # Streams the whole table with memory bounded by EXPORT_BATCH_SIZE
+    return export_response("jobs", format)
 
 
 @router.get("/{job_id}", response_model=JobWithEmployees)
-async def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(DBJob).filter(DBJob.id == job_id).first()
+async def get_job(
+    request: Request,
+    job_id: int,
+    employees_skip: int = Query(0, ge=0, description="Number of employees to skip"),
+    employees_limit: int = Query(
+        100, ge=1, le=1000, description="Maximum number of employees to embed"
+    ),
+    db=Depends(get_read_db),
+):
+    async def build(response: Response) -> JobWithEmployees:
+        result = await execute(db, select(DBJob).where(DBJob.id == job_id))
+        job = result.scalar_one_or_none()
 
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
 
-    return job
+        # The embedded list is paged in its own query instead of loading the
+        # whole relationship
+        employees = await execute(
+            db,
+            select(DBEmployee)
+            .where(DBEmployee.job_id == job_id)
+            .order_by(DBEmployee.id)
+            .offset(employees_skip)
+            .limit(employees_limit),
+        )
+
+        return JobWithEmployees(
+            id=job.id,
+            job=job.job,
+            employees=[
+                EmployeeBasic.model_validate(employee)
+                for employee in employees.scalars()
+            ],
+        )
+
+    return await cached_response(jobs_responses, request, JOB_DETAIL, build)
 
 
 @router.post("/", response_model=Job, status_code=201)
-async def create_job(
+def create_job(
     job: JobCreate,
     db: Session = Depends(get_db),
 ):
     try:
-        # Check if job name already exists
-        existing = db.query(DBJob).filter(DBJob.job == job.job).first()
-
-        if existing:
-            raise HTTPException(status_code=400, detail="Job name already exists")
-
+        # Name uniqueness is enforced by the unique index on jobs.job
         db_job = DBJob(**job.model_dump())
         db.add(db_job)
         db.commit()
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
         db.refresh(db_job)
         return db_job
     except IntegrityError:
         db.rollback()
-        raise HTTPException(status_code=400, detail="Database constraint violation")
+        raise HTTPException(status_code=400, detail="Job name already exists")
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
 @router.put("/{job_id}", response_model=Job)
-async def update_job(
+def update_job(
     job_id: int,
     job: JobUpdate,
     db: Session = Depends(get_db),
@@ -80,30 +171,26 @@ async def update_job(
         if not db_job:
             raise HTTPException(status_code=404, detail="Job not found")
 
-        # Check name uniqueness if name is being updated
-        if job.job and job.job != db_job.job:
-            existing = db.query(DBJob).filter(DBJob.job == job.job).first()
-            if existing:
-                raise HTTPException(status_code=400, detail="Job name already exists")
-
         # Update only provided fields
         update_data = job.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_job, field, value)
 
         db.commit()
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
         db.refresh(db_job)
         return db_job
     except IntegrityError:
         db.rollback()
-        raise HTTPException(status_code=400, detail="Database constraint violation")
+        raise HTTPException(status_code=400, detail="Job name already exists")
     except SQLAlchemyError as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
 @router.delete("/{job_id}", status_code=204)
-async def delete_job(
+def delete_job(
     job_id: int,
     db: Session = Depends(get_db),
 ):
@@ -113,8 +200,14 @@ async def delete_job(
         if not db_job:
             raise HTTPException(status_code=404, detail="Job not found")
 
+        # Its employees are left without a job, move their hires with them
+        unassign(db, "job_id", job_id)
         db.delete(db_job)
         db.commit()
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
+        # Employees embedded in departments responses lost their job
+        departments_responses.invalidate()
         return Response(status_code=204)
     except IntegrityError:
         db.rollback()
@@ -124,9 +217,17 @@ async def delete_job(
         raise HTTPException(status_code=500, detail="Database error occurred")
 
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_jobs_csv(
+@router.post("/upload", response_model=Union[UploadResponse, ImportJobStatus])
+@profiled
+def upload_jobs_csv(
+    response: Response,
     file: UploadFile = File(...),
+    mode: IngestionMode = Query(
+        IngestionMode.standard, description="Ingestion strategy for the file"
+    ),
+    run_async: bool = Query(
+        False, alias="async", description="Run the import as a background job"
+    ),
     db: Session = Depends(
         get_db,
     ),
@@ -134,61 +235,56 @@ async def upload_jobs_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
-    try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")), header=None)
-        df.columns = ["id", "job"]
-
-        # Validate data
-        if df.isnull().any().any():
-            raise HTTPException(status_code=400, detail="CSV contains null values")
-
-        records_inserted = 0
-        records_updated = 0
-
-        for _, row in df.iterrows():
-            existing = db.query(DBJob).filter(DBJob.id == int(row["id"])).first()
-
-            if existing:
-                existing.job = row["job"]
-                records_updated += 1
-            else:
-                new_job = DBJob(id=int(row["id"]), job=row["job"])
-                db.add(new_job)
-                records_inserted += 1
+    if mode == IngestionMode.copy and not supports_copy(db):
+        raise HTTPException(
+            status_code=400, detail="COPY ingestion requires a PostgreSQL database"
+        )
 
-        db.commit()
+    if run_async:
+        response.status_code = 202
+        return submit_import("jobs", file.file, partial(load_jobs, mode=mode))
 
-        return UploadResponse(
-            message="Jobs uploaded successfully",
-            records_inserted=records_inserted,
-            records_updated=records_updated,
-        )
+    try:
+        return load_jobs(db, file.file, [], mode=mode)
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 
 @router.post("/upload/batch", response_model=BatchResponse)
+@profiled
+@ingestion_metrics("jobs", "batch")
 def batch_insert_jobs(jobs: List[Job], db: Session = Depends(get_db)):
-    if len(jobs) < 1 or len(jobs) > 1000:
+    if len(jobs) < 1 or len(jobs) > config.BATCH_MAX_RECORDS:
         raise HTTPException(
-            status_code=400, detail="Batch size must be between 1 and 1000 records"
+            status_code=400,
+            detail=f"Batch size must be between 1 and {config.BATCH_MAX_RECORDS} records",
         )
 
     try:
         records_inserted = 0
         bulk_job = []
 
-        for job_data in jobs:
-            job = DBJob(**job_data.model_dump())
-            bulk_job.append(job)
-            records_inserted += 1
+        with stage("validate"):
+            for job_data in jobs:
+                job = DBJob(**job_data.model_dump())
+                bulk_job.append(job)
+                records_inserted += 1
 
-        db.bulk_save_objects(bulk_job)
-        db.commit()
+        with stage("write"):
+            db.bulk_save_objects(bulk_job)
+        with stage("commit"):
+            db.commit()
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
 
         return BatchResponse(
             message="Batch insert successful", records_processed=records_inserted
@@ -197,3 +293,39 @@ def batch_insert_jobs(jobs: List[Job], db: Session = Depends(get_db)):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _insert_jobs(
+    db: Session, jobs: list[tuple[int, Job]], errors: list[RowError]
+) -> int:
+    db.execute(insert(DBJob), [job.model_dump() for _, job in jobs])
+    return len(jobs)
+
+
+@router.post(
+    "/upload/batch/ndjson",
+    response_model=StreamBatchResponse,
+    openapi_extra=NDJSON_REQUEST_BODY,
+)
+@ingestion_metrics("jobs", "ndjson")
+async def batch_insert_jobs_ndjson(
+    request: Request,
+    batch_size: Optional[int] = Query(
+        None,
+        ge=1,
+        le=10000,
+        description="Records per sub-batch, defaults to NDJSON_SUB_BATCH_SIZE",
+    ),
+    db: Session = Depends(get_db),
+):
+    try:
+        return await insert_ndjson_batches(
+            request,
+            db,
+            Job,
+            _insert_jobs,
+            batch_size or config.NDJSON_SUB_BATCH_SIZE,
+        )
+    finally:
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
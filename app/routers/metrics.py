@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from app.instrumentation import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    body, media_type = render_metrics()
+    return Response(content=body, media_type=media_type)
@@ -0,0 +1,66 @@
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.dataset_migration import migrate_dataset
+from app.models.pydantic_models import DatasetMigrationResponse, IngestionMode
+from app.services.copy_ingestion import supports_copy
+
+router = APIRouter(
+    prefix="/api/v1/migrations",
+    tags=["migrations"],
+)
+
+
+@router.post("/", response_model=DatasetMigrationResponse)
+def migrate_dataset_files(
+    departments: UploadFile = File(...),
+    jobs: UploadFile = File(...),
+    employees: UploadFile = File(..., description="hired_employees.csv"),
+    mode: IngestionMode = Query(
+        IngestionMode.standard, description="Ingestion strategy for every file"
+    ),
+    parallel: bool = Query(
+        False, description="Parse and validate employees across a process pool"
+    ),
+    defer_constraints: bool = Query(
+        False,
+        description="Drop employee indexes and foreign keys during the load and "
+        "rebuild them at the end, refused unless the employees table is empty",
+    ),
+    db: Session = Depends(get_db),
+):
+    for file in (departments, jobs, employees):
+        if not file.filename.endswith(".csv"):
+            raise HTTPException(
+                status_code=400, detail=f"{file.filename} must be a CSV"
+            )
+
+    if mode == IngestionMode.copy and not supports_copy(db):
+        raise HTTPException(
+            status_code=400, detail="COPY ingestion requires a PostgreSQL database"
+        )
+
+    if mode == IngestionMode.copy and parallel:
+        raise HTTPException(
+            status_code=400, detail="Parallel parsing is not available in COPY mode"
+        )
+
+    try:
+        return migrate_dataset(
+            db,
+            departments.file,
+            jobs.file,
+            employees.file,
+            mode=mode,
+            parallel=parallel,
+            defer_constraints=defer_constraints,
+        )
+    except pd.errors.EmptyDataError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error migrating dataset: {str(e)}"
+        )
@@ -0,0 +1,153 @@
+import logging
+from datetime import datetime, timezone
+from typing import Callable
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection
+from app.database import Base
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Employee as DBEmployee
+from app.models.database_models import HiringSummary
+from app.models.database_models import Job as DBJob
+from app.models.database_models import ImportJobRecord, UploadSession
+from app.services import hiring_summary
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for the Postgres advisory lock that serializes workers
+# starting at the same time
+MIGRATION_LOCK_ID = 72_410_531
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def _create_tables(connection: Connection):
+    # Baseline, what create_all used to do at import time
+    Base.metadata.create_all(
+        connection,
+        tables=[DBDepartment.__table__, DBJob.__table__, DBEmployee.__table__],
+    )
+
+
+def _create_hiring_summary(connection: Connection):
+    HiringSummary.__table__.create(connection, checkfirst=True)
+    hiring_summary.rebuild(connection)
+
+
+def _create_indexes(connection: Connection):
+    # Unique name indexes can't be built over duplicates, name them instead
+    # of failing on the bare constraint error
+    for model, name_column in ((DBDepartment, "department"), (DBJob, "job")):
+        name = getattr(model, name_column)
+        duplicates = connection.execute(
+            select(name).group_by(name).having(func.count() > 1).limit(10)
+        ).scalars()
+        duplicates = list(duplicates)
+        if duplicates:
+            raise RuntimeError(
+                f"Duplicate {name_column} names must be resolved before "
+                f"migrating: {', '.join(map(repr, duplicates))}"
+            )
+
+    for model in (DBDepartment, DBJob, DBEmployee):
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _create_upload_sessions(connection: Connection):
+    UploadSession.__table__.create(connection, checkfirst=True)
+
+
+def _create_import_jobs(connection: Connection):
+    ImportJobRecord.__table__.create(connection, checkfirst=True)
+
+
+def _rebuild_hiring_summary(connection: Connection):
+    # Unassigned hires used to share key 0 with a real department or job id
+    hiring_summary.rebuild(connection)
+
+
+def _add_upload_session_mode(connection: Connection):
+    # Sessions created by migration 4 on this model already have it
+    columns = {
+        column["name"] for column in inspect(connection).get_columns("upload_sessions")
+    }
+    if "mode" not in columns:
+        connection.execute(
+            text(
+                "ALTER TABLE upload_sessions "
+                "ADD COLUMN mode VARCHAR(16) NOT NULL DEFAULT 'standard'"
+            )
+        )
+
+
+# Append only, a released migration must never change
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create departments, jobs and employees", _create_tables),
+    (2, "create hiring summary", _create_hiring_summary),
+    (3, "add employee, department and job indexes", _create_indexes),
+    (4, "create upload sessions", _create_upload_sessions),
+    (5, "create import jobs", _create_import_jobs),
+    (6, "move unassigned hires to a reserved key", _rebuild_hiring_summary),
+    (7, "record the ingestion mode of upload sessions", _add_upload_session_mode),
+]
+
+
+def migrate(engine: Engine) -> list[int]:
+    applied = []
+
+    # Everything runs in one transaction, a failed migration leaves the
+    # schema where it was
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID}
+            )
+
+        schema_version.create(connection, checkfirst=True)
+        current = connection.execute(
+            select(func.coalesce(func.max(schema_version.c.version), 0))
+        ).scalar()
+
+        for version, description, upgrade in MIGRATIONS:
+            if version <= current:
+                continue
+
+            logger.info("Applying schema migration %s: %s", version, description)
+            upgrade(connection)
+            connection.execute(
+                insert(schema_version).values(
+                    version=version,
+                    description=description,
+                    applied_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                )
+            )
+            applied.append(version)
+
+    return applied
+
+
+if __name__ == "__main__":
+    from app.database import get_engine
+
+    logging.basicConfig(level=logging.INFO)
+    versions = migrate(get_engine())
+    print(f"Applied migrations: {versions}" if versions else "Schema is up to date")
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import uvicorn
+from app.config import config
+
+# Production entry point: python -m app.server. Development keeps using
+# uvicorn --reload.
+
+
+def _prepare_metrics_dir():
+    # Workers are separate processes, their Prometheus samples have to be
+    # written to a shared directory so /metrics can merge them
+    path = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR",
+        os.path.join(tempfile.gettempdir(), "data-migration-metrics"),
+    )
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def main():
+    if config.SERVER_WORKERS > 1:
+        # Every worker opens its own pools, without a budget they add up to
+        # more connections than the database allows
+        if not config.DB_MAX_CONNECTIONS:
+            raise SystemExit(
+                f"DB_MAX_CONNECTIONS must be set to run {config.SERVER_WORKERS} workers"
+            )
+        _prepare_metrics_dir()
+
+    uvicorn.run(
+        "app.main:app",
+        host=config.SERVER_HOST,
+        port=config.SERVER_PORT,
+        workers=config.SERVER_WORKERS,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=config.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=config.SERVER_GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.services.hiring_summary import UNASSIGNED
+from app.services.ingestion import upsert_reference_rows
+from app.services.parsing import RowError
+
+# Session-local, so it needs no migration and is gone with the connection.
+# Digit strings outside the integer columns' range are rejected here, before
+# any ::integer cast could abort the whole load
+SAFE_INTEGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.is_integer(value text)
+RETURNS boolean LANGUAGE sql IMMUTABLE AS $$
+SELECT CASE WHEN value ~ '^-?0*[0-9]{1,10}$'
+THEN value::bigint BETWEEN -2147483648 AND 2147483647 ELSE false END
+$$
+"""
+
+# Casting to timestamp drops the zone suffix like the CSV parser and the
+# batch validator do. Values that don't look like ISO timestamps, or fail
+# the cast like 2021-02-30, become NULL instead of aborting the load
+TIMESTAMP_SQL = (
+    "CASE WHEN datetime ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' "
+    "THEN pg_temp.safe_timestamp(datetime) END"
+)
+
+SAFE_TIMESTAMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION pg_temp.safe_timestamp(value text)
+RETURNS timestamp LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    RETURN value::timestamp;
+EXCEPTION WHEN data_exception THEN
+    RETURN NULL;
+END
+$$
+"""
+
+
+def supports_copy(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _stage_csv(db: Session, staging: str, columns: dict[str, str], source) -> int:
+    # Temp table lives until the surrounding transaction commits
+    definition = ", ".join(f"{name} {type_}" for name, type_ in columns.items())
+    connection = db.connection()
+    connection.execute(
+        text(
+            f"CREATE TEMP TABLE {staging} "
+            f"(row_number bigserial, {definition}) ON COMMIT DROP"
+        )
+    )
+
+    # Stream the file straight into the staging table through psycopg2
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            source,
+        )
+    finally:
+        cursor.close()
+
+    return connection.execute(text(f"SELECT count(*) FROM {staging}")).scalar()
+
+
+def _merge_counts(db: Session, merge_sql: str, staged: int) -> tuple[int, int]:
+    inserted = (
+        db.connection()
+        .execute(
+            text(
+                f"WITH merged AS ({merge_sql} RETURNING (xmax = 0) AS inserted) "
+                "SELECT count(*) FILTER (WHERE inserted) FROM merged"
+            )
+        )
+        .scalar()
+    )
+
+    # Duplicate ids collapse into one merged row, count them as updates
+    return inserted, staged - inserted
+
+
+def copy_reference_csv(
+    db: Session, model, name_column: str, source, errors: list[RowError]
+) -> tuple[int, int]:
+    table = model.__tablename__
+    staging = f"staging_{table}"
+    # Staged as text so a bad id is reported with its row instead of
+    # failing the COPY itself
+    staged = _stage_csv(db, staging, {"id": "text", name_column: "text"}, source)
+    if staged == 0:
+        raise ValueError("CSV file is empty")
+
+    connection = db.connection()
+    nulls = connection.execute(
+        text(
+            f"SELECT count(*) FROM {staging} WHERE id IS NULL OR {name_column} IS NULL"
+        )
+    ).scalar()
+    if nulls:
+        raise ValueError("CSV contains null values")
+
+    connection.execute(text(SAFE_INTEGER_FUNCTION))
+    invalid = connection.execute(
+        text(
+            f"SELECT row_number - 1, id FROM {staging} "
+            "WHERE NOT pg_temp.is_integer(id) ORDER BY row_number LIMIT 1"
+        )
+    ).first()
+    if invalid:
+        raise ValueError(f"Row {invalid[0]}: Invalid ID {invalid[1]!r}")
+
+    try:
+        with db.begin_nested():
+            return _merge_counts(
+                db,
+                f"INSERT INTO {table} (id, {name_column}) "
+                f"SELECT DISTINCT ON (id::integer) id::integer, {name_column} "
+                f"FROM {staging} ORDER BY id::integer, row_number DESC "
+                f"ON CONFLICT (id) DO UPDATE SET {name_column} = EXCLUDED.{name_column}",
+                staged,
+            )
+    except IntegrityError:
+        pass
+
+    # A name collides with one another id holds, merge the staged rows
+    # through the row-isolating upsert instead so only those are rejected
+    rows = db.connection().execute(
+        text(
+            f"SELECT row_number - 1, id::integer, {name_column} FROM {staging} "
+            "ORDER BY row_number"
+        )
+    )
+    return upsert_reference_rows(
+        db,
+        model,
+        name_column,
+        [(idx, {"id": id_, name_column: name}) for idx, id_, name in rows],
+        errors,
+    )
+
+
+def copy_employees_csv(db: Session, source, errors: list[RowError]) -> tuple[int, int]:
+    staging = "staging_employees"
+    staged = _stage_csv(
+        db,
+        staging,
+        {
+            "id": "text",
+            "name": "text",
+            "datetime": "text",
+            "department_id": "text",
+            "job_id": "text",
+        },
+        source,
+    )
+    if staged == 0:
+        raise ValueError("CSV file is empty")
+
+    connection = db.connection()
+    connection.execute(text(SAFE_TIMESTAMP_FUNCTION))
+    connection.execute(text(SAFE_INTEGER_FUNCTION))
+
+    # Drop rows whose integer columns cannot be cast
+    invalid = connection.execute(
+        text(
+            f"DELETE FROM {staging} "
+            "WHERE NOT pg_temp.is_integer(id) "
+            "OR (department_id IS NOT NULL "
+            "AND NOT pg_temp.is_integer(department_id)) "
+            "OR (job_id IS NOT NULL AND NOT pg_temp.is_integer(job_id)) "
+            "RETURNING row_number - 1, id, department_id, job_id"
+        )
+    )
+    for idx, id_, department_id, job_id in invalid:
+        errors.append(
+            (
+                idx,
+                f"invalid integer in id={id_!r}, "
+                f"department_id={department_id!r}, job_id={job_id!r}",
+            )
+        )
+
+    # Validate foreign keys for the whole file as one anti-join
+    missing = connection.execute(
+        text(
+            f"DELETE FROM {staging} s "
+            "WHERE (s.department_id IS NOT NULL AND NOT EXISTS "
+            "(SELECT 1 FROM departments d WHERE d.id = s.department_id::integer)) "
+            "OR (s.job_id IS NOT NULL AND NOT EXISTS "
+            "(SELECT 1 FROM jobs j WHERE j.id = s.job_id::integer)) "
+            "RETURNING s.row_number - 1, s.department_id, s.job_id, "
+            "s.department_id IS NOT NULL AND NOT EXISTS "
+            "(SELECT 1 FROM departments d WHERE d.id = s.department_id::integer)"
+        )
+    )
+    for idx, department_id, job_id, department_missing in sorted(missing):
+        if department_missing:
+            errors.append((idx, f"Department ID {department_id} not found"))
+        else:
+            errors.append((idx, f"Job ID {job_id} not found"))
+
+    staged = connection.execute(text(f"SELECT count(*) FROM {staging}")).scalar()
+    if staged == 0:
+        return 0, 0
+
+    # Lock the rows about to be replaced so an overlapping upload can't
+    # read the same old values for its hiring summary deltas
+    connection.execute(
+        text(
+            "SELECT count(*) FROM (SELECT 1 FROM employees "
+            f"WHERE id IN (SELECT id::integer FROM {staging}) FOR UPDATE) locked"
+        )
+    )
+
+    # Move the replaced rows out of their hiring summary buckets and the
+    # staged ones in, before the merge overwrites the old values
+    connection.execute(
+        text(
+            "INSERT INTO hiring_summary "
+            "(department_id, job_id, year, quarter, hires) "
+            "SELECT coalesce(department_id, :unassigned), "
+            "coalesce(job_id, :unassigned), "
+            "extract(year FROM hired)::integer, "
+            "extract(quarter FROM hired)::integer, sum(delta) "
+            "FROM ("
+            "SELECT e.department_id, e.job_id, e.datetime AS hired, -1 AS delta "
+            "FROM employees e "
+            f"WHERE e.id IN (SELECT id::integer FROM {staging}) "
+            "UNION ALL ("
+            "SELECT DISTINCT ON (id::integer) department_id::integer, "
+            f"job_id::integer, {TIMESTAMP_SQL}, 1 "
+            f"FROM {staging} ORDER BY id::integer, row_number DESC"
+            ")) changes WHERE hired IS NOT NULL "
+            "GROUP BY 1, 2, 3, 4 HAVING sum(delta) <> 0 "
+            "ON CONFLICT (department_id, job_id, year, quarter) "
+            "DO UPDATE SET hires = hiring_summary.hires + EXCLUDED.hires"
+        ),
+        {"unassigned": UNASSIGNED},
+    )
+
+    return _merge_counts(
+        db,
+        "INSERT INTO employees (id, name, datetime, department_id, job_id) "
+        f"SELECT DISTINCT ON (id::integer) id::integer, name, {TIMESTAMP_SQL}, "
+        "department_id::integer, job_id::integer "
+        f"FROM {staging} ORDER BY id::integer, row_number DESC "
+        "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name, "
+        "datetime = EXCLUDED.datetime, "
+        "department_id = EXCLUDED.department_id, job_id = EXCLUDED.job_id",
+        staged,
+    )
@@ -0,0 +1,196 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.config import config
+from app.instrumentation import ingestion_metrics, stage
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Job as DBJob
+from app.models.pydantic_models import IngestionMode, UploadResponse
+from app.services.copy_ingestion import copy_employees_csv, copy_reference_csv
+from app.services.ingestion import import_employees_csv, import_reference_csv
+from app.services.parallel_ingestion import import_employees_parallel
+from app.services.parsing import EMPLOYEE_COLUMNS, RowError
+from app.services.reference_cache import departments_cache, jobs_cache
+from app.services.rejects import RejectFile, format_errors
+from app.services.response_cache import (
+    departments_responses,
+    invalidate_employee_responses,
+    jobs_responses,
+)
+from app.services.upload_sessions import UploadCheckpoint
+
+# CSV imports of whole files, shared by the upload endpoints, background
+# import jobs and the dataset migration. Each one commits its own work and
+# invalidates the caches of the table it wrote.
+
+
+def _reference_response(
+    label: str, records_inserted: int, records_updated: int, errors: list[RowError]
+) -> UploadResponse:
+    # Rows whose name another id already holds are the only per-row rejects
+    return UploadResponse(
+        message=f"{label} uploaded successfully"
+        if not errors
+        else f"{label} uploaded with errors",
+        records_inserted=records_inserted,
+        records_updated=records_updated,
+        records_rejected=len(errors),
+        errors=format_errors(errors, 10) or None,
+    )
+
+
+@ingestion_metrics("departments", "upload")
+def load_departments(
+    db: Session,
+    source,
+    errors: list[RowError],
+    on_chunk=None,
+    mode: IngestionMode = IngestionMode.standard,
+) -> UploadResponse:
+    try:
+        if mode == IngestionMode.copy:
+            # COPY parses and validates inside the database
+            with stage("write"):
+                records_inserted, records_updated = copy_reference_csv(
+                    db, DBDepartment, "department", source, errors
+                )
+        else:
+            records_inserted, records_updated = import_reference_csv(
+                db,
+                DBDepartment,
+                "department",
+                source,
+                config.UPLOAD_CHUNK_SIZE,
+                errors,
+                on_chunk,
+            )
+
+        with stage("commit"):
+            db.commit()
+    finally:
+        # Chunks may have committed even if the import failed part way
+        departments_cache.invalidate()
+        departments_responses.invalidate()
+
+    return _reference_response("Departments", records_inserted, records_updated, errors)
+
+
+@ingestion_metrics("jobs", "upload")
+def load_jobs(
+    db: Session,
+    source,
+    errors: list[RowError],
+    on_chunk=None,
+    mode: IngestionMode = IngestionMode.standard,
+) -> UploadResponse:
+    try:
+        if mode == IngestionMode.copy:
+            # COPY parses and validates inside the database
+            with stage("write"):
+                records_inserted, records_updated = copy_reference_csv(
+                    db, DBJob, "job", source, errors
+                )
+        else:
+            records_inserted, records_updated = import_reference_csv(
+                db,
+                DBJob,
+                "job",
+                source,
+                config.UPLOAD_CHUNK_SIZE,
+                errors,
+                on_chunk,
+            )
+
+        with stage("commit"):
+            db.commit()
+    finally:
+        # Chunks may have committed even if the import failed part way
+        jobs_cache.invalidate()
+        jobs_responses.invalidate()
+
+    return _reference_response("Jobs", records_inserted, records_updated, errors)
+
+
+@ingestion_metrics("employees", "upload")
+def load_employees(
+    db: Session,
+    source,
+    errors: list[RowError],
+    on_chunk=None,
+    mode: IngestionMode = IngestionMode.standard,
+    parallel: bool = False,
+    content_hash: Optional[str] = None,
+) -> UploadResponse:
+    checkpoint = None
+    if content_hash:
+        checkpoint = UploadCheckpoint("employees", content_hash)
+        checkpoint.begin(db, config.UPLOAD_CHUNK_SIZE, mode.value)
+        if checkpoint.completed:
+            return UploadResponse(
+                message="Employees already uploaded, nothing to do",
+                records_inserted=0,
+            )
+
+    rejects = RejectFile(EMPLOYEE_COLUMNS)
+    try:
+        if mode == IngestionMode.copy:
+            # COPY parses and validates inside the database
+            with stage("write"):
+                records_inserted, records_updated = copy_employees_csv(
+                    db, source, errors
+                )
+            if checkpoint:
+                # COPY commits the whole file at once, it's a single chunk
+                checkpoint.record_chunk(db, records_inserted, records_updated)
+        elif parallel:
+            records_inserted, records_updated = import_employees_parallel(
+                db, source, config.UPLOAD_CHUNK_SIZE, errors, on_chunk
+            )
+        else:
+            records_inserted, records_updated = import_employees_csv(
+                db,
+                source,
+                config.UPLOAD_CHUNK_SIZE,
+                errors,
+                on_chunk,
+                checkpoint,
+                rejects,
+            )
+
+        # Only the sequential path still has the raw rows at hand, the
+        # others record the row number and reason
+        if mode == IngestionMode.copy or parallel:
+            rejects.add_errors(errors)
+
+        if checkpoint:
+            # Report the whole file, including chunks from earlier attempts
+            checkpoint.complete(db)
+            records_inserted = checkpoint.records_inserted
+            records_updated = checkpoint.records_updated
+
+        with stage("commit"):
+            db.commit()
+    except Exception:
+        if checkpoint:
+            db.rollback()
+            checkpoint.release(db)
+        raise
+    finally:
+        rejects.close()
+        # Job and department detail responses embed employees
+        invalidate_employee_responses()
+
+    response = UploadResponse(
+        message="Employees uploaded successfully"
+        if not errors
+        else "Employees uploaded with errors",
+        records_inserted=records_inserted,
+        records_updated=records_updated,
+        records_rejected=rejects.count,
+        rejects_url=rejects.url,
+    )
+
+    if errors:
+        # Return first 10, the rest are in the reject file
+        response.errors = format_errors(errors, 10)
+
+    return response
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from datetime import datetime
+from functools import partial
+from importlib.util import find_spec
+from typing import Iterator
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app.config import config
+from app.database import SessionLocal
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Employee as DBEmployee
+from app.models.database_models import Job as DBJob
+from app.models.pydantic_models import ExportFormat
+
+EXPORT_TABLES = {
+    "departments": (DBDepartment, ["id", "department"]),
+    "jobs": (DBJob, ["id", "job"]),
+    "employees": (DBEmployee, ["id", "name", "datetime", "department_id", "job_id"]),
+}
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+
+
+def arrow_available() -> bool:
+    return find_spec("pyarrow") is not None
+
+
+def _format_value(value):
+    # Timestamps are stored as naive UTC, write them back the way they came in
+    if isinstance(value, datetime):
+        return value.isoformat() + "Z"
+    return value
+
+
+def _encode_ndjson(columns: list[str], rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(columns, map(_format_value, row)))) + "\n" for row in rows
+    ).encode()
+
+
+def _encode_csv(columns: list[str], rows) -> bytes:
+    # Same headerless layout as the upload files, so exports can be re-imported
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        [_format_value(value) for value in row] for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def _arrow_writer(columns: list[str]):
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "department_id": pa.int64(),
+        "job_id": pa.int64(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def encode(rows) -> bytes:
+        if rows is None:
+            writer.close()
+        else:
+            writer.write_batch(
+                pa.RecordBatch.from_pylist(
+                    [dict(zip(columns, row)) for row in rows], schema=schema
+                )
+            )
+
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    return encode
+
+
+def stream_table(
+    table: str, export_format: ExportFormat, batch_size: int
+) -> Iterator[bytes]:
+    model, columns = EXPORT_TABLES[table]
+
+    if export_format == ExportFormat.arrow:
+        encode = _arrow_writer(columns)
+    elif export_format == ExportFormat.csv:
+        encode = partial(_encode_csv, columns)
+    else:
+        encode = partial(_encode_ndjson, columns)
+
+    # The session is owned by the generator since it outlives the request
+    # handler; yield_per streams rows through a server-side cursor so only
+    # one batch is held in memory at a time
+    with SessionLocal() as db:
+        result = db.execute(
+            select(*(getattr(model, column) for column in columns))
+            .order_by(model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield encode(rows)
+
+    if export_format == ExportFormat.arrow:
+        yield encode(None)
+
+
+def export_response(table: str, export_format: ExportFormat) -> StreamingResponse:
+    # Checked up front, once streaming starts the status code is already sent
+    if export_format == ExportFormat.arrow and not arrow_available():
+        raise HTTPException(
+            status_code=400, detail="Arrow export requires pyarrow to be installed"
+        )
+
+    return StreamingResponse(
+        stream_table(table, export_format, config.EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{table}.{export_format.value}"'
+        },
+    )
@@ -0,0 +1,138 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import Integer, cast, delete, extract, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.database_models import Employee as DBEmployee
+from app.models.database_models import HiringSummary
+
+# Summary key for employees without a department or job: the smallest
+# integer, reserved so it never collides with a real id (0 is a valid one)
+UNASSIGNED = -(2**31)
+
+Key = tuple[int, int, int, int]
+
+
+def summary_key(
+    department_id: Optional[int], job_id: Optional[int], hired: Optional[datetime]
+) -> Optional[Key]:
+    # Employees without a hire date never show up in the yearly reports
+    if hired is None:
+        return None
+
+    return (
+        UNASSIGNED if department_id is None else department_id,
+        UNASSIGNED if job_id is None else job_id,
+        hired.year,
+        (hired.month - 1) // 3 + 1,
+    )
+
+
+def count_hires(rows: Iterable[tuple]) -> Counter:
+    # rows are (department_id, job_id, datetime)
+    hires = Counter()
+    for row in rows:
+        key = summary_key(*row)
+        if key:
+            hires[key] += 1
+    return hires
+
+
+def employee_deltas(db: Session, records: list[dict]) -> Counter:
+    # The rows being replaced move out of their old bucket, the new
+    # values move in, so updates and re-uploads keep the counts exact
+    deduped = {record["id"]: record for record in records}
+    if not deduped:
+        return Counter()
+
+    # Lock the rows being replaced, an overlapping upload of the same ids
+    # waits and then reads this one's values instead of the same pre-image
+    current = db.execute(
+        select(DBEmployee.department_id, DBEmployee.job_id, DBEmployee.datetime)
+        .where(DBEmployee.id.in_(deduped))
+        .with_for_update()
+    )
+
+    deltas = count_hires(
+        (r["department_id"], r["job_id"], r["datetime"]) for r in deduped.values()
+    )
+    deltas.subtract(count_hires(current))
+    return deltas
+
+
+def apply_deltas(db: Session, deltas: Counter):
+    rows = [
+        {
+            "department_id": department_id,
+            "job_id": job_id,
+            "year": year,
+            "quarter": quarter,
+            "hires": hires,
+        }
+        for (department_id, job_id, year, quarter), hires in deltas.items()
+        if hires
+    ]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # Adding to the stored value keeps concurrent imports from
+        # overwriting each other's counts
+        insert_ = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert_(HiringSummary)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                HiringSummary.department_id,
+                HiringSummary.job_id,
+                HiringSummary.year,
+                HiringSummary.quarter,
+            ],
+            set_={"hires": HiringSummary.hires + stmt.excluded.hires},
+        )
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            key = (row["department_id"], row["job_id"], row["year"], row["quarter"])
+            summary = db.get(HiringSummary, key)
+            if summary:
+                summary.hires += row["hires"]
+            else:
+                db.add(HiringSummary(**row))
+
+
+def unassign(db: Session, column: str, value: int):
+    # A deleted department or job leaves its employees without one
+    rows = db.execute(
+        select(HiringSummary).where(getattr(HiringSummary, column) == value)
+    ).scalars()
+
+    deltas = Counter()
+    for row in rows:
+        key = (row.department_id, row.job_id, row.year, row.quarter)
+        moved = list(key)
+        moved[0 if column == "department_id" else 1] = UNASSIGNED
+        deltas[key] -= row.hires
+        deltas[tuple(moved)] += row.hires
+
+    apply_deltas(db, deltas)
+
+
+def rebuild(db: Session) -> int:
+    # Recomputes the summary from scratch with one aggregate over employees
+    quarter = (cast(extract("month", DBEmployee.datetime), Integer) + 2) // 3
+    year = cast(extract("year", DBEmployee.datetime), Integer)
+    department_id = func.coalesce(DBEmployee.department_id, UNASSIGNED)
+    job_id = func.coalesce(DBEmployee.job_id, UNASSIGNED)
+
+    db.execute(delete(HiringSummary))
+    result = db.execute(
+        insert(HiringSummary).from_select(
+            ["department_id", "job_id", "year", "quarter", "hires"],
+            select(department_id, job_id, year, quarter, func.count())
+            .where(DBEmployee.datetime.is_not(None))
+            .group_by(department_id, job_id, year, quarter),
+        )
+    )
+    return result.rowcount
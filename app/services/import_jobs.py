@@ -0,0 +1,171 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import delete, update
+from app.config import config
+from app.database import SessionLocal
+from app.models.database_models import ImportJobRecord
+from app.models.pydantic_models import ImportJobStatus, ImportStatus, UploadResponse
+from app.services.parsing import RowError
+from app.services.rejects import format_errors
+
+# Errors kept with a job's status, like the upload responses
+MAX_STORED_ERRORS = 10
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ImportJob:
+    # An import running in this process. Its status lives in the import_jobs
+    # table so whichever worker gets the status request can answer it.
+    def __init__(self, table: str):
+        self.id = uuid.uuid4().hex
+        self.table = table
+        self.path = os.path.join(config.IMPORT_DIR, f"{self.id}.csv")
+        self.rows_processed = 0
+        self.errors: list[RowError] = []
+        self._saved_at = 0.0
+
+    def _save(self, **values):
+        # A session of its own, so progress commits never touch the import's
+        # transaction
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(ImportJobRecord)
+                .where(ImportJobRecord.id == self.id)
+                .values(
+                    rows_processed=self.rows_processed,
+                    error_count=len(self.errors),
+                    errors=format_errors(self.errors[:MAX_STORED_ERRORS]),
+                    updated_at=_now(),
+                    **values,
+                )
+            )
+            db.commit()
+        finally:
+            db.close()
+        self._saved_at = time.monotonic()
+
+    def record_chunk(self, rows: int):
+        self.rows_processed += rows
+        if time.monotonic() - self._saved_at >= config.IMPORT_PROGRESS_INTERVAL:
+            self._save()
+
+    def start(self):
+        self._save(status=ImportStatus.running.value, started_at=_now())
+
+    def finish(self, result: UploadResponse):
+        self._save(
+            status=ImportStatus.completed.value,
+            result=result.model_dump(mode="json"),
+            finished_at=_now(),
+        )
+
+    def fail(self, detail: str):
+        self._save(status=ImportStatus.failed.value, detail=detail, finished_at=_now())
+
+
+def _to_status(record: ImportJobRecord) -> ImportJobStatus:
+    elapsed = 0.0
+    if record.started_at is not None:
+        elapsed = ((record.finished_at or _now()) - record.started_at).total_seconds()
+
+    return ImportJobStatus(
+        id=record.id,
+        table=record.table_name,
+        status=record.status,
+        rows_processed=record.rows_processed,
+        rows_per_second=record.rows_processed / elapsed if elapsed > 0 else 0.0,
+        error_count=record.error_count,
+        errors=record.errors,
+        detail=record.detail,
+        result=record.result,
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=config.IMPORT_WORKERS, thread_name_prefix="import"
+            )
+        return _executor
+
+
+def _run(job: ImportJob, importer: Callable):
+    db = SessionLocal()
+    try:
+        job.start()
+        with open(job.path, "rb") as source:
+            result = importer(db, source, job.errors, job.record_chunk)
+        job.finish(result)
+    except Exception as e:
+        db.rollback()
+        job.fail(f"Error processing file: {str(e)}")
+    finally:
+        db.close()
+        os.remove(job.path)
+
+
+def submit_import(table: str, source, importer: Callable) -> ImportJobStatus:
+    # Persist the upload so the request can return before the import runs
+    os.makedirs(config.IMPORT_DIR, exist_ok=True)
+    job = ImportJob(table)
+    with open(job.path, "wb") as target:
+        shutil.copyfileobj(source, target)
+
+    db = SessionLocal()
+    try:
+        # Running jobs update their row as they go, so only finished or
+        # abandoned ones are old enough to expire
+        expired = _now() - timedelta(seconds=config.IMPORT_JOB_TTL)
+        db.execute(delete(ImportJobRecord).where(ImportJobRecord.updated_at < expired))
+
+        record = ImportJobRecord(
+            id=job.id,
+            table_name=table,
+            status=ImportStatus.pending.value,
+            rows_processed=0,
+            error_count=0,
+            errors=[],
+            updated_at=_now(),
+        )
+        db.add(record)
+        db.commit()
+        status = _to_status(record)
+    except Exception:
+        db.rollback()
+        os.remove(job.path)
+        raise
+    finally:
+        db.close()
+
+    _get_executor().submit(_run, job, importer)
+    return status
+
+
+def get_import(job_id: str) -> Optional[ImportJobStatus]:
+    db = SessionLocal()
+    try:
+        record = db.get(ImportJobRecord, job_id)
+        if record is None:
+            return None
+
+        # Expired jobs may not have been deleted yet
+        expired = _now() - timedelta(seconds=config.IMPORT_JOB_TTL)
+        return _to_status(record) if record.updated_at >= expired else None
+    finally:
+        db.close()
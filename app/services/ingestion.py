@@ -0,0 +1,256 @@
+import pandas as pd
+from typing import Callable, Optional
+from sqlalchemy import literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from app.instrumentation import stage, timed_stage
+from app.models.database_models import Employee as DBEmployee
+from app.services.hiring_summary import apply_deltas, employee_deltas
+from app.services.parsing import (
+    EMPLOYEE_COLUMNS,
+    RowError,
+    normalize_employee_chunk,
+    read_csv_chunks,
+)
+from app.services.reference_cache import departments_cache, jobs_cache
+from app.services.rejects import RejectFile
+from app.services.upload_sessions import UploadCheckpoint
+
+# ids are stored in integer columns
+MAX_ID = 2**31 - 1
+
+
+def existing_ids(db: Session, model, ids) -> set[int]:
+    ids = set(ids)
+    if not ids:
+        return set()
+
+    rows = db.execute(select(model.id).where(model.id.in_(ids)))
+    return {row[0] for row in rows}
+
+
+def filter_foreign_keys(
+    db: Session, rows: list[tuple[int, dict]], errors: list[RowError]
+) -> list[tuple[int, dict]]:
+    # Validate every FK of the chunk against the cached reference id sets
+    missing_departments = departments_cache.missing(
+        db, (r["department_id"] for _, r in rows if r["department_id"] is not None)
+    )
+    missing_jobs = jobs_cache.missing(
+        db, (r["job_id"] for _, r in rows if r["job_id"] is not None)
+    )
+
+    valid = []
+    for idx, record in rows:
+        if record["department_id"] in missing_departments:
+            errors.append((idx, f"Department ID {record['department_id']} not found"))
+            continue
+
+        if record["job_id"] in missing_jobs:
+            errors.append((idx, f"Job ID {record['job_id']} not found"))
+            continue
+
+        valid.append((idx, record))
+
+    return valid
+
+
+def upsert_records(db: Session, model, records: list[dict]) -> tuple[int, int]:
+    if not records:
+        return 0, 0
+
+    # A statement can only touch each row once, so keep the last occurrence
+    # and count the earlier ones as updates
+    deduped = list({record["id"]: record for record in records}.values())
+    columns = [c.name for c in model.__table__.columns if c.name != "id"]
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.id],
+            set_={column: stmt.excluded[column] for column in columns},
+        ).returning(literal_column("xmax = 0").label("inserted"))
+
+        # xmax is 0 only for freshly inserted tuples
+        flags = db.execute(stmt, deduped).scalars().all()
+        inserted = sum(1 for flag in flags if flag)
+    elif dialect == "sqlite":
+        existing = existing_ids(db, model, (record["id"] for record in deduped))
+
+        stmt = sqlite.insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.id],
+            set_={column: stmt.excluded[column] for column in columns},
+        )
+
+        db.execute(stmt, deduped)
+        inserted = len(deduped) - len(existing)
+    else:
+        existing = existing_ids(db, model, (record["id"] for record in deduped))
+        for record in deduped:
+            db.merge(model(**record))
+        inserted = len(deduped) - len(existing)
+
+    return inserted, len(records) - inserted
+
+
+def upsert_reference_rows(
+    db: Session,
+    model,
+    name_column: str,
+    rows: list[tuple[int, dict]],
+    errors: list[RowError],
+) -> tuple[int, int]:
+    # Names are unique, a row taking a name another id still holds (a swap,
+    # a reused name, a name repeated in the file) is rejected by the index.
+    # Bisect in savepoints until those rows are isolated, like employees
+    try:
+        with db.begin_nested():
+            return upsert_records(db, model, [record for _, record in rows])
+    except IntegrityError:
+        if len(rows) == 1:
+            idx, record = rows[0]
+            errors.append(
+                (
+                    idx,
+                    f"{name_column.capitalize()} {record[name_column]!r} "
+                    "is already used by another ID",
+                )
+            )
+            return 0, 0
+
+        middle = len(rows) // 2
+        first = upsert_reference_rows(db, model, name_column, rows[:middle], errors)
+        second = upsert_reference_rows(db, model, name_column, rows[middle:], errors)
+        return first[0] + second[0], first[1] + second[1]
+
+
+def import_reference_csv(
+    db: Session,
+    model,
+    name_column: str,
+    source,
+    chunk_size: int,
+    errors: list[RowError],
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> tuple[int, int]:
+    records_inserted = 0
+    records_updated = 0
+
+    for chunk in timed_stage(
+        "parse", read_csv_chunks(source, ["id", name_column], chunk_size)
+    ):
+        with stage("validate"):
+            if chunk.isnull().any().any():
+                raise ValueError("CSV contains null values")
+
+            # Like the COPY path, the first id that isn't an integer in the
+            # column's range fails the file with its row
+            ids = pd.to_numeric(chunk["id"], errors="coerce")
+            invalid = ids.isna() | (ids % 1 != 0) | (ids < -MAX_ID - 1) | (ids > MAX_ID)
+            if invalid.any():
+                idx = invalid.idxmax()
+                raise ValueError(f"Row {idx}: Invalid ID {str(chunk.at[idx, 'id'])!r}")
+
+            rows = [
+                (idx, {"id": int(id_), name_column: name})
+                for idx, id_, name in zip(chunk.index.tolist(), ids, chunk[name_column])
+            ]
+
+        with stage("write"):
+            inserted, updated = upsert_reference_rows(
+                db, model, name_column, rows, errors
+            )
+        records_inserted += inserted
+        records_updated += updated
+
+        with stage("commit"):
+            db.commit()
+        if on_chunk:
+            on_chunk(len(chunk))
+
+    return records_inserted, records_updated
+
+
+def _write_isolated(
+    db: Session, rows: list[tuple[int, dict]], errors: list[RowError]
+) -> tuple[int, int]:
+    # Clean rows go through as one set-based statement in a savepoint. When
+    # the database rejects the statement, bisect until the offending rows
+    # are isolated, the rest of the chunk is still written
+    try:
+        with db.begin_nested():
+            records = [record for _, record in rows]
+            apply_deltas(db, employee_deltas(db, records))
+            return upsert_records(db, DBEmployee, records)
+    except (IntegrityError, DataError) as e:
+        if len(rows) == 1:
+            reason = " ".join(str(e.orig).split())
+            errors.append((rows[0][0], f"Rejected by the database: {reason}"))
+            return 0, 0
+
+        middle = len(rows) // 2
+        first = _write_isolated(db, rows[:middle], errors)
+        second = _write_isolated(db, rows[middle:], errors)
+        return first[0] + second[0], first[1] + second[1]
+
+
+def write_employee_rows(
+    db: Session, rows: list[tuple[int, dict]], errors: list[RowError]
+) -> tuple[int, int]:
+    # Validate foreign keys and write the rows as set-based statements; the
+    # hiring summary is updated in the same transaction
+    rows = filter_foreign_keys(db, rows, errors)
+    if not rows:
+        return 0, 0
+    return _write_isolated(db, rows, errors)
+
+
+def import_employees_csv(
+    db: Session,
+    source,
+    chunk_size: int,
+    errors: list[RowError],
+    on_chunk: Optional[Callable[[int], None]] = None,
+    checkpoint: Optional[UploadCheckpoint] = None,
+    rejects: Optional[RejectFile] = None,
+) -> tuple[int, int]:
+    records_inserted = 0
+    records_updated = 0
+
+    # A resumed upload re-reads the file with the original chunk size and
+    # skips the chunks an earlier attempt already committed
+    skip = 0
+    if checkpoint:
+        chunk_size = checkpoint.chunk_size
+        skip = checkpoint.chunks_committed
+
+    for number, chunk in enumerate(
+        timed_stage("parse", read_csv_chunks(source, EMPLOYEE_COLUMNS, chunk_size))
+    ):
+        if number < skip:
+            if on_chunk:
+                on_chunk(len(chunk))
+            continue
+
+        first_error = len(errors)
+        with stage("validate"):
+            rows = normalize_employee_chunk(chunk, errors)
+
+        with stage("write"):
+            inserted, updated = write_employee_rows(db, rows, errors)
+            if rejects:
+                rejects.add_errors(errors[first_error:], chunk)
+            if checkpoint:
+                checkpoint.record_chunk(db, inserted, updated)
+        records_inserted += inserted
+        records_updated += updated
+
+        with stage("commit"):
+            db.commit()
+        if on_chunk:
+            on_chunk(len(chunk))
+
+    return records_inserted, records_updated
@@ -0,0 +1,155 @@
+from typing import AsyncIterator, Callable, Optional
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app.config import config
+from app.models.pydantic_models import StreamBatchResponse, SubBatchResult
+from app.services.parsing import RowError
+from app.services.rejects import format_errors
+
+# Documents the raw request body, the routes read it themselves
+NDJSON_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {
+                "schema": {"type": "string", "description": "One JSON record per line"}
+            }
+        },
+    }
+}
+
+
+async def read_ndjson_lines(
+    request: Request, size: int
+) -> AsyncIterator[list[tuple[int, Optional[bytes]]]]:
+    # Yields (line number, line) lists of up to size non-blank lines, only
+    # the current sub-batch and one partial line are held in memory. A line
+    # longer than NDJSON_MAX_LINE_BYTES is skipped up to its newline and
+    # yielded as None, so it is rejected without being buffered.
+    max_bytes = config.NDJSON_MAX_LINE_BYTES
+    buffer = b""
+    oversized = False
+    line_number = 0
+    lines = []
+
+    async for chunk in request.stream():
+        *complete, partial = chunk.split(b"\n")
+
+        for part in complete:
+            line_number += 1
+            line = None if oversized else buffer + part
+            buffer = b""
+            oversized = False
+
+            if line is None or len(line) > max_bytes:
+                lines.append((line_number, None))
+            elif line.strip():
+                lines.append((line_number, line))
+
+            if len(lines) >= size:
+                yield lines
+                lines = []
+
+        if not oversized:
+            buffer += partial
+            if len(buffer) > max_bytes:
+                buffer = b""
+                oversized = True
+
+    if oversized:
+        lines.append((line_number + 1, None))
+    elif buffer.strip():
+        lines.append((line_number + 1, buffer))
+
+    if lines:
+        yield lines
+
+
+def validate_lines(
+    model: type[BaseModel],
+    lines: list[tuple[int, Optional[bytes]]],
+    errors: list[RowError],
+) -> list[tuple[int, BaseModel]]:
+    records = []
+    for line_number, line in lines:
+        if line is None:
+            errors.append(
+                (line_number, f"Line exceeds {config.NDJSON_MAX_LINE_BYTES} bytes")
+            )
+            continue
+
+        try:
+            records.append((line_number, model.model_validate_json(line)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error["loc"])
+            errors.append(
+                (line_number, f"{location + ': ' if location else ''}{error['msg']}")
+            )
+    return records
+
+
+def _write(db: Session, write: Callable, records: list, errors: list[RowError]) -> int:
+    inserted = write(db, records, errors)
+    db.commit()
+    return inserted
+
+
+async def insert_ndjson_batches(
+    request: Request,
+    db: Session,
+    model: type[BaseModel],
+    write: Callable[[Session, list[tuple[int, BaseModel]], list[RowError]], int],
+    size: int,
+) -> StreamBatchResponse:
+    # Every sub-batch is validated and committed on its own, a rejected one
+    # doesn't undo the ones before it
+    response = StreamBatchResponse(
+        message="Batch insert successful", records_processed=0, records_inserted=0
+    )
+
+    batch = 0
+    async for lines in read_ndjson_lines(request, size):
+        batch += 1
+        row_errors = []
+        records = validate_lines(model, lines, row_errors)
+
+        inserted = 0
+        batch_error = None
+        if records:
+            try:
+                inserted = await run_in_threadpool(
+                    _write, db, write, records, row_errors
+                )
+            except SQLAlchemyError as e:
+                await run_in_threadpool(db.rollback)
+                batch_error = f"Batch rejected: {getattr(e, 'orig', None) or e}"
+
+        # A rejected batch is reported on its own, it isn't tied to a row
+        errors = format_errors(row_errors, 10)
+        if batch_error:
+            errors.append(batch_error)
+
+        response.records_processed += len(lines)
+        response.records_inserted += inserted
+        response.batches.append(
+            SubBatchResult(
+                batch=batch,
+                first_line=lines[0][0],
+                last_line=lines[-1][0],
+                records_received=len(lines),
+                records_inserted=inserted,
+                errors=errors[:10] or None,
+            )
+        )
+
+    if not batch:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+
+    if response.records_inserted < response.records_processed:
+        response.message = "Batch insert completed with errors"
+
+    return response
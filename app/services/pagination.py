@@ -0,0 +1,40 @@
+import base64
+import binascii
+from typing import Optional
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        prefix, _, value = decoded.decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def resolve_cursor(skip: int, after: Optional[str]) -> Optional[int]:
+    if after is None:
+        return None
+
+    if skip:
+        raise HTTPException(
+            status_code=400, detail="Use either skip or after, not both"
+        )
+
+    return decode_cursor(after)
+
+
+def set_next_cursor(response: Response, ids: list[int], limit: int):
+    # A full page may have more rows behind it; keyed on id, so the cursor
+    # stays valid while rows are inserted concurrently
+    if ids and len(ids) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(ids[-1])
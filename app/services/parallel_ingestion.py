@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from app.config import config
+from app.instrumentation import stage
+from app.services.ingestion import write_employee_rows
+from app.services.parsing import (
+    EMPLOYEE_COLUMNS,
+    RowError,
+    parse_employee_shard,
+    plan_shards,
+)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            # Spawned workers only import the pandas parsing module
+            _executor = ProcessPoolExecutor(
+                max_workers=config.get_parse_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _import_path(
+    db: Session,
+    path: str,
+    chunk_size: int,
+    errors: list[RowError],
+    on_chunk: Optional[Callable[[int], None]],
+) -> tuple[int, int]:
+    workers = config.get_parse_workers()
+    size = os.path.getsize(path)
+    shards = max(workers, -(-size // config.PARSE_SHARD_BYTES))
+    plans = iter(plan_shards(path, shards))
+
+    # Keep a bounded window of shards in flight so parsed batches don't pile
+    # up faster than the database can absorb them
+    executor = _get_executor()
+    pending = deque(
+        executor.submit(parse_employee_shard, path, *plan)
+        for plan in islice(plans, 2 * workers)
+    )
+
+    records_inserted = 0
+    records_updated = 0
+    rows_parsed = 0
+
+    while pending:
+        # Workers parse and normalize, waiting on them is the parse stage
+        with stage("parse"):
+            batch, shard_errors, shard_rows = pending.popleft().result()
+        plan = next(plans, None)
+        if plan:
+            pending.append(executor.submit(parse_employee_shard, path, *plan))
+
+        # Shards come back in file order, so the rows before this one are
+        # all counted and its row numbers can be made file-wide
+        first_row = rows_parsed
+        errors.extend((first_row + row, reason) for row, reason in shard_errors)
+        with stage("validate"):
+            rows = [
+                (first_row + idx, dict(zip(EMPLOYEE_COLUMNS, values)))
+                for idx, *values in zip(
+                    batch["row"], *(batch[column] for column in EMPLOYEE_COLUMNS)
+                )
+            ]
+        rows_parsed += shard_rows
+
+        for i in range(0, len(rows), chunk_size):
+            with stage("write"):
+                inserted, updated = write_employee_rows(
+                    db, rows[i : i + chunk_size], errors
+                )
+            records_inserted += inserted
+            records_updated += updated
+
+            with stage("commit"):
+                db.commit()
+
+        if on_chunk:
+            on_chunk(shard_rows)
+
+    if rows_parsed == 0:
+        raise pd.errors.EmptyDataError("CSV file is empty")
+
+    return records_inserted, records_updated
+
+
+def import_employees_parallel(
+    db: Session,
+    source,
+    chunk_size: int,
+    errors: list[RowError],
+    on_chunk: Optional[Callable[[int], None]] = None,
+) -> tuple[int, int]:
+    # Workers read byte ranges by path, so reuse the file if it is already
+    # on disk and spill it to IMPORT_DIR otherwise
+    path = getattr(source, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return _import_path(db, path, chunk_size, errors, on_chunk)
+
+    os.makedirs(config.IMPORT_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=config.IMPORT_DIR, suffix=".csv") as copy:
+        shutil.copyfileobj(source, copy)
+        copy.flush()
+        return _import_path(db, copy.name, chunk_size, errors, on_chunk)
@@ -0,0 +1,160 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+
+EMPLOYEE_COLUMNS = ["id", "name", "datetime", "department_id", "job_id"]
+
+# A rejected row and the reason, rows are numbered from 0 like the chunks'
+# index. Formatted for users only when a response is built
+RowError = tuple[int, str]
+
+# Z or a UTC offset following the time of day
+ZONE_SUFFIX = r"(\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)(?:Z|[+-]\d{2}(?::?\d{2})?)$"
+
+
+def read_csv_chunks(source, columns: list[str], chunk_size: int):
+    # Parse the file incrementally so memory is bounded by the chunk size
+    empty = True
+    with pd.read_csv(
+        source, header=None, names=columns, chunksize=chunk_size
+    ) as reader:
+        for chunk in reader:
+            if chunk.empty:
+                continue
+
+            empty = False
+            yield chunk
+
+    if empty:
+        raise pd.errors.EmptyDataError("CSV file is empty")
+
+
+def _to_int64(column: pd.Series) -> tuple[pd.Series, pd.Series]:
+    # Cast a nullable integer column in one pass; values that are present
+    # but not integral are flagged instead of raising
+    numeric = pd.to_numeric(column, errors="coerce")
+    invalid = column.notna() & (numeric.isna() | (numeric % 1 != 0))
+
+    # Values outside int64 come back as float or uint64 and would fail the
+    # cast for the whole chunk; at that magnitude floats are inexact, so the
+    # bound is checked conservatively
+    if numeric.dtype != np.int64:
+        invalid |= numeric.astype(np.float64).abs() >= 2.0**63
+    return numeric.where(~invalid).astype("Int64"), invalid
+
+
+def _to_objects(column: pd.Series, valid: np.ndarray) -> np.ndarray:
+    # Plain Python values with None for missing ones, ready for the DB driver
+    return column.to_numpy(dtype=object, na_value=None)[valid]
+
+
+def normalize_employee_chunk(
+    chunk: pd.DataFrame, errors: list[RowError]
+) -> list[tuple[int, dict]]:
+    ids, invalid_ids = _to_int64(chunk["id"])
+    invalid_ids |= ids.isna()
+    department_ids, invalid_departments = _to_int64(chunk["department_id"])
+    job_ids, invalid_jobs = _to_int64(chunk["job_id"])
+
+    # Timestamps are ISO 8601; the zone suffix is dropped rather than
+    # applied, like the batch validator and the COPY cast do. Anything
+    # unparseable becomes NULL
+    local = (
+        chunk["datetime"].astype("string").str.replace(ZONE_SUFFIX, r"\1", regex=True)
+    )
+    hired = pd.to_datetime(
+        local, utc=True, errors="coerce", format="ISO8601"
+    ).dt.tz_localize(None)
+
+    for mask, column, label in [
+        (invalid_ids, "id", "ID"),
+        (invalid_departments, "department_id", "Department ID"),
+        (invalid_jobs, "job_id", "Job ID"),
+    ]:
+        for idx, value in chunk.loc[mask, column].items():
+            errors.append((idx, f"Invalid {label} {value!r}"))
+
+    valid = ~(invalid_ids | invalid_departments | invalid_jobs).to_numpy()
+    hired_at = np.array(hired.dt.to_pydatetime(), dtype=object)
+    hired_at[hired.isna().to_numpy()] = None
+
+    columns = [
+        _to_objects(ids, valid),
+        _to_objects(chunk["name"], valid),
+        hired_at[valid],
+        _to_objects(department_ids, valid),
+        _to_objects(job_ids, valid),
+    ]
+
+    return [
+        (idx, dict(zip(EMPLOYEE_COLUMNS, values)))
+        for idx, *values in zip(chunk.index[valid].tolist(), *columns)
+    ]
+
+
+def _count_quotes(file, length: int) -> int:
+    quotes = 0
+    while length > 0:
+        block = file.read(min(length, 1 << 20))
+        if not block:
+            break
+
+        quotes += block.count(b'"')
+        length -= len(block)
+
+    return quotes
+
+
+def plan_shards(path: str, shards: int) -> list[tuple[int, int]]:
+    # Split the file into byte ranges that end on a record boundary: a
+    # newline outside quotes, so a quoted field spanning lines stays whole.
+    # Escaped quotes come in pairs, an odd count means a field is still open
+    size = os.path.getsize(path)
+    starts = [0]
+
+    with open(path, "rb") as file:
+        for i in range(1, shards):
+            target = size * i // shards
+            if target <= starts[-1]:
+                continue
+
+            file.seek(starts[-1])
+            quotes = _count_quotes(file, target - starts[-1])
+            while line := file.readline():
+                quotes += line.count(b'"')
+                if quotes % 2 == 0:
+                    break
+
+            position = file.tell()
+            if position >= size:
+                break
+            starts.append(position)
+
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def parse_employee_shard(
+    path: str, start: int, end: int
+) -> tuple[dict[str, list], list[RowError], int]:
+    # Runs in a worker process; returns column lists rather than row dicts
+    # to keep the payload sent back to the parent compact. Rows are numbered
+    # from the start of the shard and counted the way pandas numbers them,
+    # blank lines skipped, so the parent can number them file-wide
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    errors = []
+    batch = {column: [] for column in ["row", *EMPLOYEE_COLUMNS]}
+    if not data.strip():
+        return batch, errors, 0
+
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=EMPLOYEE_COLUMNS)
+
+    for idx, record in normalize_employee_chunk(chunk, errors):
+        batch["row"].append(idx)
+        for column in EMPLOYEE_COLUMNS:
+            batch[column].append(record[column])
+
+    return batch, errors, len(chunk)
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import config
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Job as DBJob
+
+
+class ReferenceCache:
+    def __init__(self, model, name_column: str):
+        self._model = model
+        self._name_column = name_column
+        self._lock = threading.Lock()
+        self._snapshot: Optional[tuple[list, frozenset, float]] = None
+        self.version = 0
+
+    def _load(self, db: Session) -> tuple[list, frozenset, float]:
+        # The lock is never held across the query, so async sessions running
+        # this through run_sync can't block the event loop on it
+        version = self.version
+        name = getattr(self._model, self._name_column)
+        rows = db.execute(select(self._model.id, name).order_by(self._model.id))
+
+        entries = [tuple(row) for row in rows]
+        snapshot = (entries, frozenset(id_ for id_, _ in entries), time.monotonic())
+
+        # Drop the result if the table was written to while it loaded
+        with self._lock:
+            if version == self.version:
+                self._snapshot = snapshot
+
+        return snapshot
+
+    def _get(self, db: Session) -> tuple[list, frozenset, float]:
+        # The TTL bounds staleness when another worker process changed the table
+        snapshot = self._snapshot
+        if (
+            snapshot is None
+            or time.monotonic() - snapshot[2] > config.REFERENCE_CACHE_TTL
+        ):
+            snapshot = self._load(db)
+        return snapshot
+
+    def entries(self, db: Session) -> list[tuple[int, str]]:
+        return self._get(db)[0]
+
+    def ids(self, db: Session) -> frozenset[int]:
+        return self._get(db)[1]
+
+    def missing(self, db: Session, ids) -> set[int]:
+        missing = set(ids) - self.ids(db)
+
+        # Reload once before rejecting, the rows may have been added elsewhere
+        if missing:
+            missing -= self._load(db)[1]
+
+        return missing
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self.version += 1
+
+
+departments_cache = ReferenceCache(DBDepartment, "department")
+jobs_cache = ReferenceCache(DBJob, "job")
@@ -0,0 +1,98 @@
+import csv
+import math
+import os
+import time
+import uuid
+from operator import itemgetter
+from typing import Optional
+import pandas as pd
+from app.config import config
+from app.services.parsing import RowError
+
+
+def format_errors(errors: list[RowError], limit: Optional[int] = None) -> list[str]:
+    # With a limit, the first rows of the file rather than the first errors
+    # found: the paths don't find them in row order
+    if limit is not None:
+        errors = sorted(errors, key=itemgetter(0))[:limit]
+    return [f"Row {row}: {reason}" for row, reason in errors]
+
+
+def reject_path(reject_id: str) -> str:
+    return os.path.join(config.REJECTS_DIR, f"{reject_id}.csv")
+
+
+def reject_expired(path: str) -> bool:
+    return os.path.getmtime(path) < time.time() - config.REJECTS_TTL
+
+
+def expire_rejects():
+    # Reject files hold the rows as uploaded, don't keep them past the TTL
+    try:
+        names = os.listdir(config.REJECTS_DIR)
+    except FileNotFoundError:
+        return
+
+    for name in names:
+        path = os.path.join(config.REJECTS_DIR, name)
+        try:
+            if reject_expired(path):
+                os.remove(path)
+        except FileNotFoundError:
+            # Another worker removed it first
+            pass
+
+
+def _raw(value) -> str:
+    # pandas reads integer columns with gaps as floats, write them back as
+    # they appeared in the file
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class RejectFile:
+    # Rejected rows and their reasons, written out as they are found so
+    # memory doesn't grow with the number of rejects
+    def __init__(self, columns: list[str]):
+        self.id = uuid.uuid4().hex
+        self.path = reject_path(self.id)
+        self.columns = columns
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    @property
+    def url(self) -> Optional[str]:
+        return f"/api/v1/imports/rejects/{self.id}" if self.count else None
+
+    def add(self, row: int, reason: str, values: Optional[list] = None):
+        if self._file is None:
+            os.makedirs(config.REJECTS_DIR, exist_ok=True)
+            expire_rejects()
+            self._file = open(self.path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["row", "reason", *self.columns])
+
+        values = [_raw(value) for value in values] if values else []
+        self._writer.writerow([row, reason, *values])
+        self.count += 1
+
+    def add_errors(self, errors: list[RowError], chunk: Optional[pd.DataFrame] = None):
+        # One line per rejected row, with the original values when the chunk
+        # it came from is at hand
+        reasons: dict[int, list[str]] = {}
+        for row, reason in errors:
+            reasons.setdefault(row, []).append(reason)
+
+        for row, row_reasons in sorted(reasons.items()):
+            values = None
+            if chunk is not None and row in chunk.index:
+                values = chunk.loc[row, self.columns].tolist()
+            self.add(row, "; ".join(row_reasons), values)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
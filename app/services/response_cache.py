@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, NamedTuple, Optional
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.config import config
+
+# Headers worth replaying from the handler, e.g. the pagination cursor
+_SKIPPED_HEADERS = {"content-length", "content-type"}
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: dict[str, str]
+    etag: str
+    last_modified: datetime
+    cached_at: float
+
+
+class ResponseCache:
+    # Serialized responses keyed on path and query string, evicted least
+    # recently used first
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self.version = 0
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            # The TTL bounds staleness when another worker process wrote
+            if time.monotonic() - entry.cached_at > config.RESPONSE_CACHE_TTL:
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse, version: int):
+        with self._lock:
+            # Drop the result if a write happened while it was built
+            if version != self.version or not self._max_entries:
+                return
+
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def peek(self, key: tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+
+def _not_modified(request: Request, entry: CachedResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or entry.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return entry.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+
+
+async def cached_response(
+    cache: ResponseCache,
+    request: Request,
+    adapter: TypeAdapter,
+    build: Callable[[Response], Awaitable],
+) -> Response:
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    entry = cache.get(key)
+    if entry is None:
+        version = cache.version
+
+        # build() sets any extra headers on the scratch response
+        scratch = Response()
+        body = adapter.dump_json(await build(scratch))
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        # Content that didn't change keeps its Last-Modified across rebuilds
+        previous = cache.peek(key)
+        last_modified = (
+            previous.last_modified
+            if previous and previous.etag == etag
+            else datetime.now(timezone.utc).replace(microsecond=0)
+        )
+
+        entry = CachedResponse(
+            body=body,
+            headers={
+                name: value
+                for name, value in scratch.headers.items()
+                if name not in _SKIPPED_HEADERS
+            },
+            etag=etag,
+            last_modified=last_modified,
+            cached_at=time.monotonic(),
+        )
+        cache.put(key, entry, version)
+
+    headers = {
+        **entry.headers,
+        "ETag": entry.etag,
+        "Last-Modified": format_datetime(entry.last_modified, usegmt=True),
+        # Clients may keep the body but have to revalidate it
+        "Cache-Control": "no-cache",
+    }
+
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+departments_responses = ResponseCache(config.RESPONSE_CACHE_SIZE)
+jobs_responses = ResponseCache(config.RESPONSE_CACHE_SIZE)
+
+
+def invalidate_employee_responses():
+    departments_responses.invalidate()
+    jobs_responses.invalidate()
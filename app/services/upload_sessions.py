@@ -0,0 +1,137 @@
+import hashlib
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import config
+from app.models.database_models import UploadSession
+
+
+class UploadInProgress(Exception):
+    pass
+
+
+def hash_file(source) -> str:
+    digest = hashlib.sha256()
+    for block in iter(lambda: source.read(1024 * 1024), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class UploadCheckpoint:
+    # Tracks one attempt at a resumable upload. The attempt owns the session
+    # row until it finishes, fails, or stops checkpointing for longer than
+    # UPLOAD_SESSION_LEASE.
+    def __init__(self, table: str, content_hash: str):
+        self.table = table
+        self.content_hash = content_hash.lower()
+        self.owner = uuid.uuid4().hex
+        self.chunk_size = 0
+        self.chunks_committed = 0
+        self.records_inserted = 0
+        self.records_updated = 0
+        self.completed = False
+
+    def _key(self):
+        return and_(
+            UploadSession.table_name == self.table,
+            UploadSession.content_hash == self.content_hash,
+        )
+
+    def _update(self, db: Session, **values):
+        result = db.execute(
+            update(UploadSession)
+            .where(self._key(), UploadSession.owner == self.owner)
+            .values(updated_at=_now(), **values)
+        )
+        if result.rowcount != 1:
+            raise UploadInProgress("Upload was taken over by another attempt")
+
+    def begin(self, db: Session, chunk_size: int, mode: str):
+        try:
+            db.add(
+                UploadSession(
+                    table_name=self.table,
+                    content_hash=self.content_hash,
+                    chunk_size=chunk_size,
+                    mode=mode,
+                    chunks_committed=0,
+                    records_inserted=0,
+                    records_updated=0,
+                    completed=False,
+                    updated_at=_now(),
+                )
+            )
+            db.commit()
+        except IntegrityError:
+            # An earlier attempt created it, resume from its checkpoint
+            db.rollback()
+
+        # Claiming is a single conditional update, so two attempts can't
+        # both own the session
+        lease_expired = _now() - timedelta(seconds=config.UPLOAD_SESSION_LEASE)
+        claimed = db.execute(
+            update(UploadSession)
+            .where(
+                self._key(),
+                UploadSession.completed.is_(False),
+                or_(
+                    UploadSession.owner.is_(None),
+                    UploadSession.updated_at < lease_expired,
+                ),
+            )
+            .values(owner=self.owner, updated_at=_now())
+        ).rowcount
+        db.commit()
+
+        session = db.execute(select(UploadSession).where(self._key())).scalar_one()
+        self.chunk_size = session.chunk_size
+        self.chunks_committed = session.chunks_committed
+        self.records_inserted = session.records_inserted
+        self.records_updated = session.records_updated
+        self.completed = session.completed
+
+        if not claimed and not self.completed:
+            raise UploadInProgress("An upload of this file is already in progress")
+
+        if claimed and session.mode != mode:
+            # COPY reloads the whole file, it can't pick up after standard
+            # chunks and its counts would add to theirs
+            if self.chunks_committed:
+                self.release(db)
+                raise ValueError(
+                    f"This upload was started in {session.mode} mode, "
+                    "resume it in the same mode"
+                )
+            self._update(db, mode=mode)
+            db.commit()
+
+    def record_chunk(self, db: Session, inserted: int, updated: int):
+        # Runs inside the chunk's transaction, the checkpoint commits with it
+        self.chunks_committed += 1
+        self.records_inserted += inserted
+        self.records_updated += updated
+        self._update(
+            db,
+            chunks_committed=self.chunks_committed,
+            records_inserted=self.records_inserted,
+            records_updated=self.records_updated,
+        )
+
+    def complete(self, db: Session):
+        self._update(db, completed=True, owner=None)
+        self.completed = True
+
+    def release(self, db: Session):
+        # Lets a retry resume right away instead of waiting out the lease
+        try:
+            self._update(db, owner=None)
+            db.commit()
+        except UploadInProgress:
+            db.rollback()
@@ -0,0 +1,301 @@
+# Ingestion benchmark. Generates data with benchmarks.generate_data, drives
+# the upload endpoints through the ASGI app and prints one JSON document
+# with rows/sec, peak RSS and database round trips per scenario, meant to
+# be saved as a baseline and diffed between runs.
+#
+#   python -m benchmarks.bench_ingestion [--rows 10k] [--scenarios upload,ndjson]
+#       [--database-url postgresql://...] [--output baseline.json]
+#
+# Each scenario runs in its own process against an empty database: a fresh
+# SQLite file by default, or the given database with its tables emptied
+# first. Only the employees load is measured, departments and jobs are
+# loaded beforehand. Round trips count statements sent through SQLAlchemy;
+# rows streamed by COPY don't add to them, and peak RSS doesn't include
+# the parse worker processes of upload-parallel.
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from benchmarks.generate_data import OUTPUT_DIR, generate, parse_rows
+
+SCENARIOS = ["upload", "upload-parallel", "upload-copy", "batch", "ndjson"]
+
+
+def _upload(client, table: str, path: Path, **params) -> dict:
+    with open(path, "rb") as source:
+        response = client.post(
+            f"/api/v1/{table}/upload",
+            params=params,
+            files={"file": (path.name, source)},
+        )
+    response.raise_for_status()
+    return response.json()
+
+
+def _ndjson_file(data_dir: Path) -> Path:
+    import pandas as pd
+    from app.services.parsing import EMPLOYEE_COLUMNS
+
+    path = data_dir / "hired_employees.ndjson"
+    if path.exists():
+        return path
+
+    with open(path, "w") as target:
+        for chunk in pd.read_csv(
+            data_dir / "hired_employees.csv",
+            header=None,
+            names=EMPLOYEE_COLUMNS,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=100_000,
+        ):
+            chunk = chunk.rename(columns={"datetime": "timestamp"})
+            for column in chunk.columns:
+                chunk[column] = chunk[column].where(chunk[column] != "", None)
+            chunk.to_json(target, orient="records", lines=True)
+            target.write("\n")
+
+    return path
+
+
+def _run_upload(client, data_dir: Path, timer: list, **params) -> dict:
+    start = time.perf_counter()
+    result = _upload(client, "employees", data_dir / "hired_employees.csv", **params)
+    timer.append(time.perf_counter() - start)
+    return result
+
+
+def _run_batch(client, data_dir: Path, timer: list) -> dict:
+    import pandas as pd
+    from app.config import config
+    from app.services.parsing import EMPLOYEE_COLUMNS
+
+    # The JSON endpoint rejects a whole batch over one bad timestamp, so
+    # the client drops those rows like a producer would
+    result = {"records_inserted": 0, "records_rejected": 0}
+    for chunk in pd.read_csv(
+        data_dir / "hired_employees.csv",
+        header=None,
+        names=EMPLOYEE_COLUMNS,
+        chunksize=config.BATCH_MAX_RECORDS,
+    ):
+        hired = pd.to_datetime(
+            chunk["datetime"], utc=True, errors="coerce", format="ISO8601"
+        )
+        valid = chunk["datetime"].isna() | hired.notna()
+        result["records_rejected"] += int((~valid).sum())
+
+        chunk = chunk[valid].rename(columns={"datetime": "timestamp"})
+        body = chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+
+        start = time.perf_counter()
+        response = client.post("/api/v1/employees/upload/batch", json=body)
+        timer.append(time.perf_counter() - start)
+        response.raise_for_status()
+        result["records_inserted"] += response.json()["records_processed"]
+
+    return result
+
+
+def _run_ndjson(client, data_dir: Path, timer: list) -> dict:
+    path = _ndjson_file(data_dir)
+
+    def body():
+        with open(path, "rb") as source:
+            yield from iter(lambda: source.read(1024 * 1024), b"")
+
+    start = time.perf_counter()
+    response = client.post(
+        "/api/v1/employees/upload/batch/ndjson",
+        content=body(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    timer.append(time.perf_counter() - start)
+    response.raise_for_status()
+
+    result = response.json()
+    result["records_rejected"] = (
+        result["records_processed"] - result["records_inserted"]
+    )
+    return result
+
+
+def run_scenario(scenario: str, data_dir: Path, database_url: str) -> dict:
+    # Pin the dev config, otherwise an exported ENV_STATE would point the
+    # benchmark, and the deletes below, at another database
+    os.environ["ENV_STATE"] = "dev"
+    os.environ["DEV_DATABASE_URL"] = database_url
+    os.environ["DEV_DB_ECHO"] = "false"
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import delete, event
+    from sqlalchemy.engine import make_url
+    from app.database import Base, get_engine, get_sync_database_url
+    from app.main import app
+
+    engine = get_engine()
+    if engine.url != make_url(get_sync_database_url(database_url)):
+        raise SystemExit(
+            f"Refusing to run against {engine.url!r}, expected {database_url}"
+        )
+
+    with TestClient(app) as client:
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(delete(table))
+
+        _upload(client, "departments", data_dir / "departments.csv")
+        _upload(client, "jobs", data_dir / "jobs.csv")
+
+        round_trips = 0
+
+        def count(conn, cursor, statement, *args):
+            nonlocal round_trips
+            # SQLite engines issue their own BEGIN, it isn't a query
+            if statement != "BEGIN":
+                round_trips += 1
+
+        if scenario == "ndjson":
+            _ndjson_file(data_dir)
+
+        event.listen(engine, "before_cursor_execute", count)
+        timer = []
+        if scenario == "upload":
+            result = _run_upload(client, data_dir, timer)
+        elif scenario == "upload-parallel":
+            result = _run_upload(client, data_dir, timer, parallel="true")
+        elif scenario == "upload-copy":
+            result = _run_upload(client, data_dir, timer, mode="copy")
+        elif scenario == "batch":
+            result = _run_batch(client, data_dir, timer)
+        else:
+            result = _run_ndjson(client, data_dir, timer)
+        event.remove(engine, "before_cursor_execute", count)
+
+    with open(data_dir / "hired_employees.csv", "rb") as source:
+        rows = sum(1 for _ in source)
+
+    seconds = sum(timer)
+    return {
+        "scenario": scenario,
+        "database": engine.dialect.name,
+        "rows": rows,
+        "records_inserted": result.get("records_inserted", 0),
+        "records_updated": result.get("records_updated", 0),
+        "records_rejected": result.get("records_rejected", 0),
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds, 1) if seconds else None,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "round_trips": round_trips,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10k", help="10k, 1m, 10m or a number")
+    parser.add_argument(
+        "--scenarios",
+        default="upload,upload-parallel,batch,ndjson",
+        help=f"comma separated, from {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="run against this database instead of a temporary SQLite file",
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--data", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Child process, runs one scenario and reports it on stdout
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, args.data, args.database_url)))
+        return
+
+    rows = parse_rows(args.rows)
+    data_dir = OUTPUT_DIR / str(rows)
+    if not (data_dir / "hired_employees.csv").exists():
+        generate(rows, data_dir)
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for scenario in scenarios:
+            database_url = (
+                args.database_url or f"sqlite:///{Path(workdir) / scenario}.db"
+            )
+            if scenario == "upload-copy" and database_url.startswith("sqlite"):
+                print("skipping upload-copy, it needs PostgreSQL", file=sys.stderr)
+                continue
+
+            child = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.bench_ingestion",
+                    "--scenario",
+                    scenario,
+                    "--data",
+                    str(data_dir),
+                    "--database-url",
+                    database_url,
+                ],
+                capture_output=True,
+                text=True,
+            )
+            if child.returncode:
+                sys.stderr.write(child.stderr)
+                raise SystemExit(f"Scenario {scenario} failed")
+
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            print(
+                f"{scenario:16} {result['rows_per_second'] or 0:>12,.0f} rows/s "
+                f"{result['peak_rss_mb']:>8.1f} MB {result['round_trips']:>8} round trips",
+                file=sys.stderr,
+            )
+            results.append(result)
+
+    report = json.dumps(
+        {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "rows": rows,
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Compares the row-by-row employee parsing that upload_jobs_csv used to do
+# with the vectorized normalization stage on data/hired_employees.csv
+# scaled up 100x.
+#
+#   python -m benchmarks.bench_normalize [--scale 100] [--chunk-size 1000]
+
+import argparse
+import time
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from app.services.parsing import EMPLOYEE_COLUMNS, normalize_employee_chunk
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "hired_employees.csv"
+
+
+def parse_datetime_from_csv(dt_str: str) -> datetime:
+    if not dt_str or dt_str.strip() == "":
+        return None
+
+    try:
+        dt_str_cleaned = dt_str.replace("Z", "+00:00")
+        return datetime.fromisoformat(dt_str_cleaned).replace(tzinfo=None)
+    except Exception:
+        return None
+
+
+def rowwise_employee_chunk(chunk: pd.DataFrame, errors: list[str]) -> list:
+    rows = []
+
+    for idx, row in chunk.iterrows():
+        try:
+            hire_datetime = None
+            if pd.notna(row["datetime"]):
+                hire_datetime = parse_datetime_from_csv(str(row["datetime"]))
+
+            rows.append(
+                (
+                    idx,
+                    {
+                        "id": int(row["id"]),
+                        "name": row["name"] if pd.notna(row["name"]) else None,
+                        "datetime": hire_datetime
+                        if pd.notna(row["datetime"])
+                        else None,
+                        "department_id": int(row["department_id"])
+                        if pd.notna(row["department_id"])
+                        else None,
+                        "job_id": int(row["job_id"])
+                        if pd.notna(row["job_id"])
+                        else None,
+                    },
+                )
+            )
+        except Exception as e:
+            errors.append(f"Row {idx}: {str(e)}")
+
+    return rows
+
+
+def load_scaled(scale: int) -> pd.DataFrame:
+    base = pd.read_csv(DATA_FILE, header=None, names=EMPLOYEE_COLUMNS)
+    frames = []
+    for i in range(scale):
+        frame = base.copy()
+        frame["id"] = frame["id"] + i * len(base)
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def run(parser, df: pd.DataFrame, chunk_size: int) -> tuple[float, list]:
+    rows = []
+    errors = []
+
+    start = time.perf_counter()
+    for i in range(0, len(df), chunk_size):
+        rows.extend(parser(df.iloc[i : i + chunk_size], errors))
+    return time.perf_counter() - start, rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    df = load_scaled(args.scale)
+    rowwise_time, rowwise_rows = run(rowwise_employee_chunk, df, args.chunk_size)
+    vectorized_time, vectorized_rows = run(
+        normalize_employee_chunk, df, args.chunk_size
+    )
+
+    if rowwise_rows != vectorized_rows:
+        raise SystemExit("Vectorized output differs from the row-wise parser")
+
+    print(f"rows:       {len(df)}")
+    print(f"row-wise:   {rowwise_time:.3f}s ({len(df) / rowwise_time:,.0f} rows/s)")
+    print(
+        f"vectorized: {vectorized_time:.3f}s ({len(df) / vectorized_time:,.0f} rows/s)"
+    )
+    print(f"speedup:    {rowwise_time / vectorized_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
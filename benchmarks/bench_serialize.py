@@ -0,0 +1,104 @@
+# Compares p50/p99 latency of GET /api/v1/employees/ (column tuples
+# serialized with orjson) against the ORM + Pydantic validation path it
+# replaced, on a throwaway SQLite database loaded with
+# data/hired_employees.csv scaled up.
+#
+#   python -m benchmarks.bench_serialize [--scale 10] [--limit 1000] [--requests 200]
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_serialize.db")
+
+# Pin the dev config, otherwise an exported ENV_STATE would point the
+# benchmark at a real database
+os.environ["ENV_STATE"] = "dev"
+os.environ["DEV_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEV_DB_ECHO"] = "false"
+os.environ["DEV_DB_ASYNC"] = "false"
+
+from typing import List  # noqa: E402
+from fastapi import Depends  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+from app.database import get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.database_models import Employee as DBEmployee  # noqa: E402
+from app.models.pydantic_models import Employee  # noqa: E402
+from benchmarks.bench_normalize import load_scaled  # noqa: E402
+
+
+@app.get("/legacy/employees", response_model=List[Employee])
+def legacy_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    # ORM objects validated through Employee.from_attributes by FastAPI
+    return (
+        db.query(DBEmployee)
+        .options(joinedload(DBEmployee.department), joinedload(DBEmployee.job))
+        .order_by(DBEmployee.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+
+
+def upload(client: TestClient, table: str, path: Path):
+    with open(path, "rb") as source:
+        response = client.post(
+            f"/api/v1/{table}/upload", files={"file": (path.name, source)}
+        )
+    response.raise_for_status()
+
+
+def measure(client: TestClient, path: str, pages: int, limit: int, requests: int):
+    latencies = []
+    for i in range(requests):
+        params = {"skip": (i % pages) * limit, "limit": limit}
+        start = time.perf_counter()
+        response = client.get(path, params=params)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return percentiles[49] * 1000, percentiles[98] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        upload(client, "departments", DATA_DIR / "departments.csv")
+        upload(client, "jobs", DATA_DIR / "jobs.csv")
+
+        employees = load_scaled(args.scale)
+        with tempfile.NamedTemporaryFile(suffix=".csv") as csv_file:
+            employees.to_csv(csv_file.name, header=False, index=False)
+            upload(client, "employees", Path(csv_file.name))
+
+        pages = max(len(employees) // args.limit, 1)
+
+        # Both paths must produce the same body
+        params = {"limit": args.limit}
+        fast = client.get("/api/v1/employees/", params=params).json()
+        legacy = client.get("/legacy/employees", params=params).json()
+        if fast != legacy:
+            raise SystemExit("Fast path output differs from the legacy path")
+
+        for label, path in (
+            ("orm + pydantic", "/legacy/employees"),
+            ("tuples + orjson", "/api/v1/employees/"),
+        ):
+            p50, p99 = measure(client, path, pages, args.limit, args.requests)
+            print(f"{label:16} p50 {p50:7.2f}ms  p99 {p99:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
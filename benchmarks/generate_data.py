@@ -0,0 +1,128 @@
+# Generates departments.csv, jobs.csv and hired_employees.csv shaped like
+# the files in data/: the same reference data, headerless rows, ISO 8601
+# UTC timestamps, and the same kinds of gaps (missing hire dates,
+# departments and jobs) plus a few malformed timestamps.
+#
+#   python -m benchmarks.generate_data --rows 1m [--out DIR] [--seed 42]
+#
+# Files go to <tmp>/data-migration-bench/<rows>/ unless --out is given.
+
+import argparse
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+OUTPUT_DIR = Path(tempfile.gettempdir()) / "data-migration-bench"
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Per-column share of empty values, about what data/hired_employees.csv has
+NULL_RATE = 0.006
+MALFORMED_RATE = 0.001
+MALFORMED_TIMESTAMPS = np.array(
+    ["2021-13-01T00:00:00Z", "07/11/2021 02:48", "2021-02-30", "not a date"],
+    dtype=object,
+)
+
+WRITE_CHUNK = 500_000
+
+
+def parse_rows(value: str) -> int:
+    return SIZES.get(value.lower()) or int(value)
+
+
+def _name_parts() -> tuple[np.ndarray, np.ndarray]:
+    names = pd.read_csv(DATA_DIR / "hired_employees.csv", header=None, usecols=[1])[
+        1
+    ].dropna()
+    parts = names.str.split(" ", n=1, expand=True).dropna()
+    return parts[0].unique(), parts[1].unique()
+
+
+def _with_nulls(values: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < NULL_RATE] = None
+    return values
+
+
+def _employee_chunk(
+    start: int,
+    size: int,
+    rng: np.random.Generator,
+    first_names: np.ndarray,
+    last_names: np.ndarray,
+    departments: int,
+    jobs: int,
+) -> pd.DataFrame:
+    names = (
+        rng.choice(first_names, size).astype(object)
+        + " "
+        + rng.choice(last_names, size).astype(object)
+    )
+
+    # Hire dates spread over 2020-2022 like the analytics queries expect
+    seconds = rng.integers(0, 3 * 365 * 24 * 3600, size)
+    hired = np.datetime64("2020-01-01T00:00:00") + seconds.astype("timedelta64[s]")
+    timestamps = (np.datetime_as_string(hired, unit="s").astype(object)) + "Z"
+
+    malformed = rng.random(size) < MALFORMED_RATE
+    timestamps[malformed] = rng.choice(MALFORMED_TIMESTAMPS, malformed.sum())
+
+    return pd.DataFrame(
+        {
+            "id": np.arange(start + 1, start + size + 1),
+            "name": names,
+            "datetime": _with_nulls(timestamps, rng),
+            "department_id": _with_nulls(rng.integers(1, departments + 1, size), rng),
+            "job_id": _with_nulls(rng.integers(1, jobs + 1, size), rng),
+        }
+    )
+
+
+def generate(rows: int, out: Path, seed: int = 42) -> Path:
+    out.mkdir(parents=True, exist_ok=True)
+    employees_path = out / "hired_employees.csv"
+
+    # Reference data is small and fixed, reuse the real files
+    for name in ("departments.csv", "jobs.csv"):
+        shutil.copyfile(DATA_DIR / name, out / name)
+
+    departments = len(pd.read_csv(DATA_DIR / "departments.csv", header=None))
+    jobs = len(pd.read_csv(DATA_DIR / "jobs.csv", header=None))
+    first_names, last_names = _name_parts()
+    rng = np.random.default_rng(seed)
+
+    with open(employees_path, "w", newline="") as target:
+        for start in range(0, rows, WRITE_CHUNK):
+            chunk = _employee_chunk(
+                start,
+                min(WRITE_CHUNK, rows - start),
+                rng,
+                first_names,
+                last_names,
+                departments,
+                jobs,
+            )
+            chunk.to_csv(target, header=False, index=False)
+
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", default="10k", help="10k, 1m, 10m or a number")
+    parser.add_argument("--out", type=Path, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    out = args.out or OUTPUT_DIR / str(rows)
+    generate(rows, out, args.seed)
+    print(out)
+
+
+if __name__ == "__main__":
+    main()
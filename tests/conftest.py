@@ -0,0 +1,21 @@
+import os
+import tempfile
+
+# Set before the app is imported: pin the dev config to a throwaway SQLite
+# database, an exported ENV_STATE must never point the tests at a real one
+DB_PATH = os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["ENV_STATE"] = "dev"
+os.environ["DEV_DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEV_DB_ECHO"] = "false"
+os.environ["DEV_DB_ASYNC"] = "false"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # The context manager runs the startup migrations
+    with TestClient(app) as client:
+        yield client
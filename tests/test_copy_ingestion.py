@@ -0,0 +1,89 @@
+# COPY ingestion runs only on PostgreSQL. Point POSTGRES_TEST_URL at a
+# throwaway database to run these, everything is rolled back afterwards.
+
+import io
+import os
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.database import get_sync_database_url
+from app.models.database_models import Department as DBDepartment
+from app.models.database_models import Employee as DBEmployee
+from app.models.database_models import Job as DBJob
+from app.schema_migrations import migrate
+from app.services.copy_ingestion import copy_employees_csv, copy_reference_csv
+
+POSTGRES_URL = os.environ.get("POSTGRES_TEST_URL")
+
+pytestmark = pytest.mark.skipif(not POSTGRES_URL, reason="POSTGRES_TEST_URL is not set")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(get_sync_database_url(POSTGRES_URL))
+    migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        session.add(DBDepartment(id=900001, department="copy test department"))
+        session.add(DBJob(id=900001, job="copy test job"))
+        session.flush()
+        yield session
+        session.rollback()
+
+
+def test_out_of_range_integers_are_rejected_per_row(db):
+    source = io.StringIO(
+        "900001,Valid,2021-01-01T00:00:00Z,900001,900001\n"
+        "900002,Department,2021-01-01T00:00:00Z,3000000000,900001\n"
+        "3000000000,Id,2021-01-01T00:00:00Z,900001,900001\n"
+        "900003,Job,2021-01-01T00:00:00Z,900001,-3000000000\n"
+    )
+    errors = []
+
+    inserted, updated = copy_employees_csv(db, source, errors)
+
+    assert (inserted, updated) == (1, 0)
+    assert [row for row, _ in errors] == [1, 2, 3]
+    assert db.get(DBEmployee, 900001).name == "Valid"
+
+
+def test_name_collisions_are_rejected_per_row(db):
+    db.add(DBDepartment(id=900002, department="copy test other"))
+    db.flush()
+    source = io.StringIO(
+        "900001,copy test other\n"
+        "900002,copy test department\n"
+        "900003,copy test new\n"
+        "900004,copy test new\n"
+    )
+    errors = []
+
+    inserted, updated = copy_reference_csv(
+        db, DBDepartment, "department", source, errors
+    )
+
+    assert (inserted, updated) == (1, 0)
+    assert [row for row, _ in errors] == [0, 1, 3]
+    assert db.get(DBDepartment, 900001).department == "copy test department"
+
+
+def test_offset_timestamps_keep_their_wall_clock_time(db):
+    source = io.StringIO("900001,Offset,2021-01-01T05:00:00+02:00,,\n")
+
+    copy_employees_csv(db, source, [])
+
+    assert db.get(DBEmployee, 900001).datetime == datetime(2021, 1, 1, 5, 0)
+
+
+@pytest.mark.parametrize("id_", ["x", "3000000000"])
+def test_invalid_reference_id_fails_with_its_row(db, id_):
+    source = io.StringIO(f"900005,copy test g\n{id_},copy test h\n")
+
+    with pytest.raises(ValueError, match=f"Row 1: Invalid ID '{id_}'"):
+        copy_reference_csv(db, DBDepartment, "department", source, [])
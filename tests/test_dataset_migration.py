@@ -0,0 +1,36 @@
+# Deferring the employee constraints drops them for everyone, so it is
+# only allowed for an initial load into an empty table.
+
+from pathlib import Path
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+from app.database import get_engine
+from app.models.database_models import Employee as DBEmployee
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def migrate(client: TestClient, **params):
+    names = {
+        "departments": "departments.csv",
+        "jobs": "jobs.csv",
+        "employees": "hired_employees.csv",
+    }
+    files = {
+        field: (name, (DATA_DIR / name).read_bytes()) for field, name in names.items()
+    }
+    return client.post("/api/v1/migrations/", files=files, params=params)
+
+
+def test_defer_constraints_is_refused_on_a_loaded_table(client):
+    migrate(client).raise_for_status()
+
+    response = migrate(client, defer_constraints=True)
+
+    assert response.status_code == 400
+    assert "employees table is empty" in response.json()["detail"]
+    # Nothing was dropped
+    indexes = {
+        index["name"] for index in inspect(get_engine()).get_indexes("employees")
+    }
+    assert {index.name for index in DBEmployee.__table__.indexes} <= indexes
@@ -0,0 +1,34 @@
+# Every ingestion path stores the wall-clock time of an offset timestamp
+# and drops the offset, so a record is stored the same way whichever
+# endpoint loaded it.
+
+from datetime import datetime
+from app.database import SessionLocal
+from app.models.database_models import Employee as DBEmployee
+
+HIRED = "2021-01-01T05:00:00+02:00"
+
+
+def stored_datetime(id_: int) -> datetime:
+    with SessionLocal() as db:
+        return db.get(DBEmployee, id_).datetime
+
+
+def test_csv_upload_drops_the_offset(client):
+    response = client.post(
+        "/api/v1/employees/upload",
+        files={"file": ("upload.csv", f"9101,Offset,{HIRED},,\n".encode())},
+    )
+    response.raise_for_status()
+
+    assert stored_datetime(9101) == datetime(2021, 1, 1, 5, 0)
+
+
+def test_batch_insert_drops_the_offset(client):
+    response = client.post(
+        "/api/v1/employees/upload/batch",
+        json=[{"id": 9102, "name": "Offset", "timestamp": HIRED}],
+    )
+    response.raise_for_status()
+
+    assert stored_datetime(9102) == datetime(2021, 1, 1, 5, 0)
@@ -0,0 +1,34 @@
+# Hires without a department or job are counted under a reserved key that
+# never collides with a real department or job id.
+
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.database_models import HiringSummary
+from app.services.hiring_summary import UNASSIGNED
+
+
+def upload(client, table: str, body: str):
+    response = client.post(
+        f"/api/v1/{table}/upload", files={"file": ("upload.csv", body.encode())}
+    )
+    response.raise_for_status()
+
+
+def test_unassigned_hires_are_kept_apart_from_id_zero(client):
+    upload(client, "departments", "0,Department zero\n")
+    upload(client, "jobs", "0,Job zero\n")
+    upload(
+        client,
+        "employees",
+        "9201,Zero,1999-01-01T00:00:00Z,0,0\n9202,Unassigned,1999-01-01T00:00:00Z,,\n",
+    )
+
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(
+                HiringSummary.department_id, HiringSummary.job_id, HiringSummary.hires
+            ).where(HiringSummary.year == 1999)
+        )
+        hires = {(department_id, job_id): n for department_id, job_id, n in rows}
+
+    assert hires == {(0, 0): 1, (UNASSIGNED, UNASSIGNED): 1}
@@ -0,0 +1,60 @@
+# Parallel parsing splits the file into shards parsed by a spawned process
+# pool. It must count, number and reject rows exactly like the sequential
+# path, blank lines and quoted multi-line fields included.
+
+import pytest
+from fastapi.testclient import TestClient
+from app.config import config
+
+
+def employees_csv(first_id: int) -> bytes:
+    lines = []
+    for i in range(200):
+        id_ = first_id + i
+        if i % 37 == 5:
+            lines.append("")
+        if i % 41 == 7:
+            lines.append(f'{id_},"Multi\nline name",2021-01-01T00:00:00Z,,')
+        elif i % 23 == 3:
+            lines.append(f"{id_},Unknown department,2021-01-01T00:00:00Z,987654,")
+        elif i % 29 == 11:
+            lines.append(f"bad{i},Invalid id,2021-01-01T00:00:00Z,,")
+        else:
+            lines.append(f"{id_},Employee {i},2021-01-01T00:00:00Z,,")
+    # A repeated id is an update
+    lines.append(f"{first_id},Employee 0 again,2021-01-01T00:00:00Z,,")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def upload(client: TestClient, body: bytes, parallel: bool) -> tuple[dict, list]:
+    response = client.post(
+        "/api/v1/employees/upload",
+        params={"parallel": parallel},
+        files={"file": ("employees.csv", body)},
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+
+    # Row and reason, the values differ with the ids
+    rejects = client.get(result["rejects_url"]).text.splitlines()[1:]
+    return result, [line.split(",")[:2] for line in rejects]
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    monkeypatch.setattr(config, "PARSE_WORKERS", 2)
+    monkeypatch.setattr(config, "PARSE_SHARD_BYTES", 1024)
+
+
+def test_parallel_matches_sequential(client, small_shards):
+    sequential, sequential_rejects = upload(client, employees_csv(20000), False)
+    parallel, parallel_rejects = upload(client, employees_csv(30000), True)
+
+    for field in ("records_inserted", "records_updated", "records_rejected"):
+        assert parallel[field] == sequential[field], field
+    assert sequential["records_updated"] == 1
+    # Invalid ids are reported with their value, the ids themselves differ
+    assert [e.split(":")[0] for e in parallel["errors"]] == [
+        e.split(":")[0] for e in sequential["errors"]
+    ]
+    assert parallel_rejects == sequential_rejects
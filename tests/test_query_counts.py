@@ -0,0 +1,75 @@
+# Counts the SQL statements each read endpoint issues against the sample
+# data, and fails when an endpoint goes over its budget (a lazy
+# relationship load per row shows up here long before it shows up in
+# latency).
+
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import get_engine
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# (path, params, maximum statements)
+ENDPOINTS = [
+    ("/api/v1/employees/", {"limit": 1000}, 1),
+    ("/api/v1/employees/", {"limit": 1000, "skip": 1000}, 1),
+    ("/api/v1/jobs/1", {}, 2),
+    ("/api/v1/jobs/1", {"employees_limit": 1000}, 2),
+    ("/api/v1/departments/1", {}, 2),
+    ("/api/v1/departments/1", {"employees_limit": 1000}, 2),
+]
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, *args):
+        # SQLite engines issue their own BEGIN, it isn't a query
+        if statement != "BEGIN":
+            self.count += 1
+
+
+def upload(client: TestClient, table: str, filename: str):
+    with open(DATA_DIR / filename, "rb") as source:
+        response = client.post(
+            f"/api/v1/{table}/upload", files={"file": (filename, source)}
+        )
+    response.raise_for_status()
+
+
+@pytest.fixture(scope="module")
+def counter(client):
+    upload(client, "departments", "departments.csv")
+    upload(client, "jobs", "jobs.csv")
+    upload(client, "employees", "hired_employees.csv")
+
+    counter = StatementCounter()
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine, "before_cursor_execute", counter)
+
+
+@pytest.mark.parametrize("path, params, budget", ENDPOINTS)
+def test_statement_budget(client, counter, path, params, budget):
+    counter.count = 0
+    response = client.get(path, params=params)
+    response.raise_for_status()
+
+    assert counter.count <= budget, (
+        f"{path} {params}: {counter.count} statements (max {budget})"
+    )
+
+
+@pytest.mark.parametrize("path", ["/api/v1/jobs/1", "/api/v1/departments/1"])
+def test_repeat_is_cached(client, counter, path):
+    client.get(path).raise_for_status()
+
+    # The repeat is answered from the response cache
+    counter.count = 0
+    client.get(path).raise_for_status()
+
+    assert counter.count == 0, f"{path}: {counter.count} statements on a repeat"
@@ -0,0 +1,75 @@
+# Department and job names are unique. An upload that gives a name to a
+# second id is reported per row instead of failing the whole file.
+
+import pytest
+from fastapi.testclient import TestClient
+
+# (table, name column), ids are kept clear of the sample data
+TABLES = [("departments", "department"), ("jobs", "job")]
+
+
+def upload(client: TestClient, table: str, rows: list[tuple[int, str]]) -> dict:
+    body = "".join(f"{id_},{name}\n" for id_, name in rows)
+    response = client.post(
+        f"/api/v1/{table}/upload", files={"file": ("upload.csv", body.encode())}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def names(client: TestClient, table: str, ids: list[int]) -> list[str]:
+    _, column = next(entry for entry in TABLES if entry[0] == table)
+    return [client.get(f"/api/v1/{table}/{id_}").json()[column] for id_ in ids]
+
+
+@pytest.mark.parametrize("table, column", TABLES)
+def test_swapped_names_are_rejected(client, table, column):
+    upload(client, table, [(9001, f"{table} a"), (9002, f"{table} b")])
+
+    result = upload(client, table, [(9001, f"{table} b"), (9002, f"{table} a")])
+
+    assert result["records_rejected"] == 2
+    assert result["errors"] == [
+        f"Row 0: {column.capitalize()} '{table} b' is already used by another ID",
+        f"Row 1: {column.capitalize()} '{table} a' is already used by another ID",
+    ]
+    assert names(client, table, [9001, 9002]) == [f"{table} a", f"{table} b"]
+
+
+@pytest.mark.parametrize("table, column", TABLES)
+def test_duplicate_names_keep_the_first_row(client, table, column):
+    result = upload(
+        client,
+        table,
+        [(9003, f"{table} c"), (9004, f"{table} d"), (9005, f"{table} c")],
+    )
+
+    assert result["records_inserted"] == 2
+    assert result["records_rejected"] == 1
+    assert result["errors"] == [
+        f"Row 2: {column.capitalize()} '{table} c' is already used by another ID"
+    ]
+    assert client.get(f"/api/v1/{table}/9005").status_code == 404
+
+
+@pytest.mark.parametrize("table, column", TABLES)
+def test_new_id_reusing_a_name_is_rejected(client, table, column):
+    upload(client, table, [(9006, f"{table} e")])
+
+    result = upload(client, table, [(9007, f"{table} f"), (9008, f"{table} e")])
+
+    assert result["records_inserted"] == 1
+    assert result["records_rejected"] == 1
+    assert names(client, table, [9006, 9007]) == [f"{table} e", f"{table} f"]
+
+
+@pytest.mark.parametrize("table, column", TABLES)
+@pytest.mark.parametrize("id_", ["x", "3000000000"])
+def test_invalid_id_fails_the_file_with_its_row(client, table, column, id_):
+    body = f"9009,{table} g\n{id_},{table} h\n".encode()
+    response = client.post(
+        f"/api/v1/{table}/upload", files={"file": ("upload.csv", body)}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Row 1: Invalid ID '{id_}'"
@@ -0,0 +1,55 @@
+# Reject files hold rejected rows as uploaded, they are only kept for
+# REJECTS_TTL.
+
+import os
+from app.config import config
+from app.services.rejects import RejectFile, reject_path
+
+
+def test_expired_reject_files_are_removed(client):
+    old = RejectFile(["id"])
+    old.add(0, "old reject", [1])
+    old.close()
+    expired = os.path.getmtime(old.path) - config.REJECTS_TTL - 1
+    os.utime(old.path, (expired, expired))
+
+    assert client.get(f"/api/v1/imports/rejects/{old.id}").status_code == 404
+
+    # The next reject file written sweeps the expired ones
+    new = RejectFile(["id"])
+    new.add(0, "new reject", [2])
+    new.close()
+
+    assert not os.path.exists(reject_path(old.id))
+    assert client.get(f"/api/v1/imports/rejects/{new.id}").status_code == 200
+
+
+def test_every_rejected_row_is_in_the_reject_file(client):
+    body = "9301,Valid,2021-01-01T00:00:00Z,,\nx,Bad,2021-01-01T00:00:00Z,,\n"
+    body += "9302,Bad department,2021-01-01T00:00:00Z,987654,\n"
+    response = client.post(
+        "/api/v1/employees/upload", files={"file": ("upload.csv", body.encode())}
+    )
+    result = response.json()
+
+    rejects = client.get(result["rejects_url"]).text.splitlines()
+
+    assert result["records_rejected"] == 2
+    assert [line.split(",")[:2] for line in rejects[1:]] == [
+        ["1", "Invalid ID 'x'"],
+        ["2", "Department ID 987654 not found"],
+    ]
+
+
+def test_response_errors_are_in_row_order(client):
+    # The unknown department is found after the invalid id of a later row
+    body = "9303,Unknown department,2021-01-01T00:00:00Z,987654,\n"
+    body += "y,Invalid id,2021-01-01T00:00:00Z,,\n"
+    response = client.post(
+        "/api/v1/employees/upload", files={"file": ("upload.csv", body.encode())}
+    )
+
+    assert response.json()["errors"] == [
+        "Row 0: Department ID 987654 not found",
+        "Row 1: Invalid ID 'y'",
+    ]
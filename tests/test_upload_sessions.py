@@ -0,0 +1,45 @@
+# A resumed upload has to use the ingestion mode of the attempt that
+# committed its first chunks, COPY can't pick up where standard chunks left.
+
+import pytest
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.database_models import UploadSession
+from app.services.upload_sessions import UploadCheckpoint
+
+
+def attempt(content_hash: str, mode: str) -> UploadCheckpoint:
+    # Every attempt is a request of its own, with its own session
+    checkpoint = UploadCheckpoint("employees", content_hash)
+    with SessionLocal() as db:
+        checkpoint.begin(db, 1000, mode)
+    return checkpoint
+
+
+def test_mode_change_is_refused_after_a_committed_chunk():
+    first = attempt("a" * 64, "standard")
+    with SessionLocal() as db:
+        first.record_chunk(db, 1000, 0)
+        db.commit()
+        first.release(db)
+
+    with pytest.raises(ValueError, match="started in standard mode"):
+        attempt("a" * 64, "copy")
+
+    # The refused attempt gave the session back
+    resumed = attempt("a" * 64, "standard")
+    assert (resumed.chunks_committed, resumed.records_inserted) == (1, 1000)
+
+
+def test_mode_can_change_before_any_chunk_is_committed():
+    first = attempt("b" * 64, "standard")
+    with SessionLocal() as db:
+        first.release(db)
+
+    attempt("b" * 64, "copy")
+
+    with SessionLocal() as db:
+        mode = db.execute(
+            select(UploadSession.mode).where(UploadSession.content_hash == "b" * 64)
+        ).scalar_one()
+    assert mode == "copy"